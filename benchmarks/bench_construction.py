@@ -0,0 +1,24 @@
+import torchyield as ty
+import pytest
+
+def make_layers(n):
+    return ty.make_layers(
+            ty.linear_relu_layer,
+            in_channels=8,
+            out_channels=[8] * (n // 2),
+    )
+
+@pytest.mark.benchmark(group='construction')
+@pytest.mark.parametrize('n', [1000, 10000])
+def bench_module_from_layers(benchmark, n):
+    benchmark(lambda: ty.module_from_layers(make_layers(n)))
+
+@pytest.mark.benchmark(group='construction')
+@pytest.mark.parametrize('n', [1000, 10000])
+def bench_frozen_sequential(benchmark, n):
+    benchmark(lambda: ty.FrozenSequential(make_layers(n)))
+
+@pytest.mark.benchmark(group='construction')
+@pytest.mark.parametrize('n', [1000, 10000])
+def bench_frozen_sequential_meta(benchmark, n):
+    benchmark(lambda: ty.FrozenSequential(make_layers(n), device='meta'))
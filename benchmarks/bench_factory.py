@@ -0,0 +1,43 @@
+import torchyield as ty
+import pytest
+
+from torchyield.factory import make_factory
+
+FACTORY_NAME = 'conv2_bn_relu_maxpool_layer'
+
+@pytest.mark.benchmark(group='factory lookup')
+def bench_lookup_cached(benchmark):
+    benchmark(getattr, ty, FACTORY_NAME)
+
+@pytest.mark.benchmark(group='factory lookup')
+def bench_lookup_uncached(benchmark):
+    benchmark(make_factory.__wrapped__, FACTORY_NAME)
+
+@pytest.mark.benchmark(group='factory call')
+def bench_call(benchmark):
+    # Build the smallest possible modules, on the meta device, so that the 
+    # overhead of the factory itself is as visible as possible.
+    factory = getattr(ty, FACTORY_NAME)
+    benchmark(
+            lambda: list(factory(
+                in_channels=1,
+                out_channels=1,
+                kernel_size=1,
+                pool_size=2,
+                device='meta',
+            ))
+    )
+
+@pytest.mark.benchmark(group='make_layers')
+@pytest.mark.parametrize('n', [100, 1000])
+def bench_make_layers(benchmark, n):
+    benchmark(
+            lambda: list(ty.make_layers(
+                ty.conv2_bn_relu_maxpool_layer,
+                in_channels=1,
+                out_channels=[1] * n,
+                kernel_size=[1, 3] * (n // 2),
+                pool_size=[1, 2, 1, 1] * (n // 4),
+                device='meta',
+            ))
+    )
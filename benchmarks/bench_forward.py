@@ -0,0 +1,47 @@
+import torch
+import torch.nn as nn
+import torchyield as ty
+import pytest
+import runpy
+
+from pathlib import Path
+
+DEMOS = Path(__file__).parents[1] / 'demos'
+
+def make_layers(depth):
+    return ty.make_layers(
+            ty.linear_relu_layer,
+            in_channels=8,
+            out_channels=[8] * depth,
+    )
+
+def make_alexnet(demo):
+    alexnet = runpy.run_path(DEMOS / f'{demo}.py')['alexnet']
+    return ty.module_from_layers(alexnet(), input_shape=(1, 3, 227, 227))
+
+@pytest.fixture(autouse=True)
+def no_grad():
+    with torch.no_grad():
+        yield
+
+@pytest.mark.benchmark(group='forward overhead')
+@pytest.mark.parametrize('depth', [1, 10, 100])
+@pytest.mark.parametrize('container', ['nn.Sequential', 'ty.FrozenSequential'])
+def bench_forward_overhead(benchmark, container, depth):
+    layers = make_layers(depth)
+
+    if container == 'nn.Sequential':
+        f = nn.Sequential(*layers)
+    else:
+        f = ty.FrozenSequential(layers)
+
+    x = torch.randn(1, 8)
+    benchmark(f, x)
+
+@pytest.mark.benchmark(group='alexnet')
+@pytest.mark.parametrize('batch_size', [1, 4, 16])
+@pytest.mark.parametrize('demo', ['alexnet_1', 'alexnet_2'])
+def bench_alexnet(benchmark, demo, batch_size):
+    f = make_alexnet(demo).eval()
+    x = torch.randn(batch_size, 3, 227, 227)
+    benchmark(f, x)
@@ -0,0 +1,59 @@
+"""
+Measure how much activation checkpointing reduces the memory needed for the 
+backward pass, and how much extra time it costs.
+
+Usage:
+    python benchmarks/checkpoint.py [<depth>] [<batch size>]
+
+Memory is measured as the total size of all the tensors that autograd keeps 
+for the backward pass, outside of any checkpointed segments.  This doesn't 
+include the inputs to each segment, which are kept alive by the checkpoint 
+itself, so those are added separately.
+"""
+
+import sys
+import torch
+import torchyield as ty
+
+from time import perf_counter
+
+def make_layers(depth):
+    return ty.make_layers(
+            ty.conv2_bn_relu_layer,
+            in_channels=16,
+            out_channels=[16] * depth,
+            kernel_size=3,
+            padding=1,
+    )
+
+def measure(f, x):
+    saved = {}
+
+    def pack(tensor):
+        key = tensor.untyped_storage().data_ptr()
+        saved[key] = tensor.untyped_storage().nbytes()
+        return tensor
+
+    x = x.clone().requires_grad_()
+
+    start = perf_counter()
+    with torch.autograd.graph.saved_tensors_hooks(pack, lambda x: x):
+        y = f(x)
+    y.sum().backward()
+    elapsed = perf_counter() - start
+
+    segment_inputs = len(f._segments or ()) * x.nbytes
+    return (sum(saved.values()) + segment_inputs) / 2**20, elapsed * 1e3
+
+if __name__ == '__main__':
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+
+    x = torch.randn(batch_size, 16, 32, 32)
+
+    print(f"{'segments':>8} {'memory (MiB)':>13} {'time (ms)':>10}")
+
+    for n in [None, 2, 4, 8, 16]:
+        f = ty.FrozenSequential(make_layers(depth), checkpoint_segments=n)
+        memory, elapsed = measure(f, x)
+        print(f'{str(n):>8} {memory:>13.1f} {elapsed:>10.1f}')
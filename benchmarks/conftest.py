@@ -0,0 +1,26 @@
+"""
+Benchmarks for the overhead of constructing and evaluating models.
+
+Usage:
+    pip install -e .[bench]
+    pytest benchmarks --benchmark-autosave
+    pytest benchmarks --benchmark-compare
+
+The first command saves the results for the current commit, and the second 
+compares the current commit to the most recently saved results.  Everything 
+runs on a single CPU thread with a fixed random seed, to keep the results as 
+reproducible as possible.
+"""
+
+import torch
+import pytest
+
+@pytest.fixture(autouse=True)
+def reproducible():
+    num_threads = torch.get_num_threads()
+    torch.set_num_threads(1)
+    torch.manual_seed(0)
+
+    yield
+
+    torch.set_num_threads(num_threads)
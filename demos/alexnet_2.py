@@ -26,19 +26,27 @@ def alexnet():
     # difference is that instead of using the given factory to 
     # make the last layer, it just makes a plain linear layer. 
     # This is because you typically don't want any nonlinear/ 
-    # regularization layers after the last linear layer.
+    # regularization layers after the last linear layer.  The 
+    # number of input channels is 'auto', which means that it 
+    # will be inferred from the output of the convolutional 
+    # layers.  This requires specifying the input shape when 
+    # building the model.
     yield from ty.mlp_layer(
             ty.linear_relu_dropout_layer,
-            **ty.channels([36 * 256, 4096, 4096, 1000])
+            **ty.channels(['auto', 4096, 4096, 1000])
     )
 
 if __name__ == '__main__':
     # Convert the generator into an instance of `torch.nn.Sequential`:
-    f = ty.Layers(alexnet())
+    x = torch.randn(1, 3, 227, 227)
+    f = ty.module_from_layers(alexnet(), input_shape=x.shape)
+
+    # Print the shape of the output from each layer:
+    for module, shape in ty.infer_shapes(f.children(), x.shape):
+        print(f'{str(tuple(shape)):<20} {module}')
 
     # Demonstrate that the model works, i.e. it can make a prediction 
     # given random input:
-    x = torch.randn(1, 3, 227, 227)
     y = f(x)
     print(torch.argmax(y))  # tensor(388)
 
@@ -0,0 +1,132 @@
+import torch
+import torch.nn as nn
+import torchyield as ty
+import importlib
+import json
+
+OPTIONS = {
+        'memory_format': [None, 'channels_last'],
+        'fuse': [False, True],
+        'inplace': [None, True, False],
+}
+
+def cnn():
+    yield from ty.conv2_bn_relu_layer(
+            in_channels=3,
+            out_channels=4,
+            kernel_size=3,
+    )
+    yield from ty.conv2_bn_relu_layer(
+            in_channels=4,
+            out_channels=4,
+            kernel_size=3,
+    )
+
+def test_autotune():
+    x = torch.randn(2, 3, 8, 8)
+    modules = list(ty.modules_from_layers(cnn()))
+    f = ty.autotune(modules, x, options=OPTIONS, repeat=2)
+
+    assert isinstance(f, ty.FrozenSequential)
+    assert not f.training
+
+    # One plan per conv-bn-relu block.
+    assert len(f.tuning_plan) == 2
+    assert all(set(plan) == set(OPTIONS) for plan in f.tuning_plan)
+
+    # Every variant should compute the same thing as the original modules.
+    g = nn.Sequential(*modules).eval()
+    torch.testing.assert_close(f(x), g(x))
+
+def test_autotune_cache(tmp_path):
+    x = torch.randn(2, 3, 8, 8)
+
+    f = ty.autotune(cnn(), x, options=OPTIONS, cache_dir=tmp_path, repeat=2)
+    path, = tmp_path.glob('*.json')
+    assert json.loads(path.read_text()) == f.tuning_plan
+
+    # Make sure the cached plan is used, rather than measuring again.
+    plans = [
+            dict(memory_format='channels_last', fuse=True, inplace=False),
+            dict(memory_format=None, fuse=False, inplace=None),
+    ]
+    path.write_text(json.dumps(plans))
+
+    f = ty.autotune(cnn(), x, options=OPTIONS, cache_dir=tmp_path)
+    block_1, block_2 = f.children()
+
+    assert f.tuning_plan == plans
+    assert len(list(block_1.children())) == 2
+    assert len(list(block_2.children())) == 3
+
+    # A different input shape isn't covered by the cache.
+    ty.autotune(cnn(), torch.randn(2, 3, 9, 9), options=OPTIONS, cache_dir=tmp_path, repeat=2)
+    assert len(list(tmp_path.glob('*.json'))) == 2
+
+def test_build_variant():
+    modules = list(ty.modules_from_layers(cnn()))
+    f = ty.build_variant(modules, dict(fuse=True, inplace=False))
+    conv1, relu1, conv2, relu2 = f.children()
+
+    assert isinstance(conv1, nn.Conv2d)
+    assert relu1.inplace is False
+    assert relu2.inplace is False
+
+    # The original modules aren't modified.
+    assert modules[2].inplace is True
+
+def test_build_variant_inplace_none():
+    modules = [
+            nn.Linear(2, 2),
+            nn.ReLU(inplace=False),
+            nn.Linear(2, 2),
+            nn.ReLU(inplace=True),
+    ]
+    f = ty.build_variant(modules, dict(inplace=None))
+    _, relu1, _, relu2 = f.children()
+
+    assert relu1.inplace is False
+    assert relu2.inplace is True
+
+def test_build_variant_inplace_input():
+    modules = [nn.Flatten(), nn.Dropout(), nn.ReLU(), nn.Linear(4, 4), nn.ReLU()]
+    f = ty.build_variant(modules, dict(inplace=True))
+    flatten, dropout, relu1, linear, relu2 = f.children()
+
+    # These modules would overwrite the input.
+    assert dropout.inplace is False
+    assert relu1.inplace is False
+    assert relu2.inplace is True
+
+    x = torch.randn(3, 2, 2)
+    x0 = x.clone()
+    f(x)
+
+    torch.testing.assert_close(x, x0)
+
+def test_autotune_rejects_wrong_variant(monkeypatch):
+    # `ty.autotune` is the function, not the module.
+    tya = importlib.import_module('torchyield.autotune')
+
+    class Double(nn.Module):
+        def forward(self, x):
+            return 2 * x
+
+    build_variant = tya.build_variant
+
+    def build_wrong_variant(modules, plan):
+        f = build_variant(modules, plan)
+        if plan['fuse']:
+            f = ty.FrozenSequential([f, Double()])
+        return f
+
+    # Make the wrong variants look faster than everything else.
+    def measure(model, x, repeat):
+        return 0 if isinstance(list(model.children())[-1], Double) else 1
+
+    monkeypatch.setattr(tya, 'build_variant', build_wrong_variant)
+    monkeypatch.setattr(tya, '_measure', measure)
+
+    f = ty.autotune(cnn(), torch.randn(2, 3, 8, 8), options=OPTIONS)
+
+    assert all(plan['fuse'] is False for plan in f.tuning_plan)
@@ -0,0 +1,53 @@
+import torch
+import torch.nn as nn
+import torchyield as ty
+import pytest
+
+def _layers():
+    return ty.linear_bn_relu_layer(in_channels=2, out_channels=3)
+
+def test_load_cached_modules(tmp_path):
+    f = ty.module_from_layers(_layers(), cache_dir=tmp_path, seed=1)
+    assert len(list(tmp_path.glob('*.pt'))) == 1
+
+    g = ty.module_from_layers(_layers(), cache_dir=tmp_path, seed=1)
+    assert len(list(tmp_path.glob('*.pt'))) == 1
+
+    torch.testing.assert_close(f.state_dict(), g.state_dict())
+    assert not g[0].weight.is_meta
+
+def test_load_cached_modules_matches_seed(tmp_path):
+    torch.manual_seed(1)
+    f = ty.module_from_layers(_layers())
+
+    g = ty.module_from_layers(_layers(), cache_dir=tmp_path, seed=1)
+
+    torch.testing.assert_close(f.state_dict(), g.state_dict())
+
+def test_load_cached_modules_rng_unchanged(tmp_path):
+    torch.manual_seed(0)
+    ty.module_from_layers(_layers(), cache_dir=tmp_path, seed=1)
+    x = torch.rand(1)
+
+    torch.manual_seed(0)
+    y = torch.rand(1)
+
+    assert x == y
+
+def test_load_cached_modules_err_skip(tmp_path):
+    with pytest.raises(ValueError, match="can't cache parameters that are never initialized"):
+        ty.module_from_layers(_layers(), cache_dir=tmp_path, init='skip')
+
+    assert not list(tmp_path.iterdir())
+
+def test_get_cache_key():
+    def key(layers, seed):
+        with torch.device('meta'):
+            return ty.get_cache_key(nn.Sequential(*layers), seed)
+
+    k = key(_layers(), 1)
+
+    assert key(_layers(), 1) == k
+    assert key(_layers(), 2) != k
+    assert key(ty.linear_relu_layer(in_channels=2, out_channels=3), 1) != k
+    assert key(ty.linear_bn_relu_layer(in_channels=2, out_channels=4), 1) != k
@@ -0,0 +1,111 @@
+import torch
+import torch.nn as nn
+import torchyield as ty
+import pytest
+
+def mlp(dropout_p=0):
+    yield from ty.mlp_layer(
+            ty.linear_relu_dropout_layer,
+            **ty.channels([3, 4, 2]),
+            dropout_p=dropout_p,
+    )
+
+def test_ensemble():
+    f = ty.ensemble(mlp, n=3, seed=1)
+    x = torch.randn(5, 3)
+    y = f(x)
+
+    assert len(f) == 3
+    assert y.shape == (3, 5, 2)
+
+    for i in range(3):
+        torch.manual_seed(1 + i)
+        g = ty.module_from_layers(mlp())
+        torch.testing.assert_close(y[i], g(x))
+
+def test_ensemble_in_dim():
+    f = ty.ensemble(mlp, n=2, seed=1)
+    x = torch.randn(2, 5, 3)
+    y = f(x, in_dim=0)
+
+    assert y.shape == (2, 5, 2)
+
+    torch.manual_seed(2)
+    g = ty.module_from_layers(mlp())
+    torch.testing.assert_close(y[1], g(x[1]))
+
+def test_ensemble_params():
+    f = ty.ensemble(mlp, dropout_p=[0.0, 0.5, 0.0], seed=1)
+    f.eval()
+
+    x = torch.randn(5, 3)
+    y = f(x)
+
+    assert y.shape == (3, 5, 2)
+
+    for i in range(3):
+        torch.manual_seed(1 + i)
+        g = ty.module_from_layers(mlp())
+        torch.testing.assert_close(y[i], g(x))
+
+def test_ensemble_params_train():
+    f = ty.ensemble(mlp, dropout_p=[0.0, 1.0, 0.5], seed=1)
+    x = torch.randn(5, 3)
+    y = f(x)
+
+    # p=0: Same as a standalone member, even in training mode.
+    torch.manual_seed(1)
+    g = ty.module_from_layers(mlp())
+    torch.testing.assert_close(y[0], g(x))
+
+    # p=1: Every hidden activation is dropped, so only the output bias is 
+    # left.
+    bias = f.member_state_dict(1)['3.bias']
+    torch.testing.assert_close(y[1], bias.expand(5, 2))
+
+    # p=0.5: The surviving activations are rescaled, so the output differs 
+    # from that in eval mode.
+    f.eval()
+    assert not torch.allclose(y[2], f(x)[2])
+
+def test_ensemble_batch_norm():
+    def layers():
+        yield from ty.linear_bn_layer(in_channels=3, out_channels=2)
+
+    f = ty.ensemble(layers, n=2)
+    f(torch.randn(5, 3))
+
+    assert f.module[1].running_mean.shape == (2, 2)
+    assert f.module[1].num_batches_tracked.tolist() == [1, 1]
+
+def test_ensemble_member_state_dict():
+    f = ty.ensemble(mlp, n=2, seed=1)
+
+    torch.manual_seed(2)
+    g = ty.module_from_layers(mlp())
+
+    torch.testing.assert_close(f.member_state_dict(1), g.state_dict())
+
+    torch.manual_seed(3)
+    h = ty.module_from_layers(mlp())
+    f.load_member_state_dict(0, h.state_dict())
+
+    x = torch.randn(5, 3)
+    torch.testing.assert_close(f(x)[0], h(x))
+    torch.testing.assert_close(f(x)[1], g(x))
+
+def test_ensemble_err_num_members():
+    with pytest.raises(ValueError, match="expected 3 members, but got parameters for 2"):
+        ty.ensemble(mlp, n=3, dropout_p=[0.1, 0.2])
+
+def test_ensemble_err_empty():
+    with pytest.raises(ValueError, match="no members"):
+        ty.Ensemble([])
+
+def test_ensemble_err_architecture():
+    members = [
+            nn.Sequential(nn.Linear(2, 2), nn.ReLU()),
+            nn.Sequential(nn.Linear(2, 2), nn.Tanh()),
+    ]
+    with pytest.raises(ValueError, match=r"submodule '1' differs: ReLU\(\), Tanh\(\)"):
+        ty.Ensemble(members)
@@ -0,0 +1,76 @@
+import torch
+import torch.nn as nn
+import torchyield as ty
+
+def test_estimate_conv():
+    est = ty.estimate(
+            ty.conv2_bn_relu_maxpool_layer(
+                in_channels=3,
+                out_channels=8,
+                kernel_size=3,
+                pool_size=2,
+            ),
+            input_shape=(2, 3, 10, 10),
+    )
+    conv, bn, relu, pool = est.layers
+
+    assert isinstance(conv.module, nn.Conv2d)
+    assert conv.module.weight.is_meta
+    assert conv.input_shape == (2, 3, 10, 10)
+    assert conv.output_shape == (2, 8, 8, 8)
+    assert conv.params == 8 * 3 * 3 * 3
+    assert conv.macs == (2 * 8 * 8 * 8) * (3 * 3 * 3)
+    assert conv.flops == 2 * conv.macs
+    assert conv.activation_bytes == 2 * 8 * 8 * 8 * 4
+
+    assert bn.params == 2 * 8
+    assert bn.macs == 0
+    assert bn.flops == 2 * (2 * 8 * 8 * 8)
+    assert bn.activation_bytes == 2 * 8 * 8 * 8 * 4
+
+    assert relu.params == 0
+    assert relu.activation_bytes == 0
+
+    assert pool.output_shape == (2, 8, 4, 4)
+    assert pool.flops == (2 * 8 * 4 * 4) * (2 * 2)
+
+    assert est.params == conv.params + bn.params
+    assert est.macs == conv.macs
+    assert est.flops == conv.flops + bn.flops + relu.flops + pool.flops
+    assert est.activation_bytes == \
+            conv.activation_bytes + bn.activation_bytes + pool.activation_bytes
+
+def test_estimate_mlp():
+
+    def mlp():
+        yield nn.Flatten()
+        yield from ty.mlp_layer(
+                ty.linear_relu_dropout_layer,
+                **ty.channels(['auto', 16, 4]),
+                dtype=torch.float16,
+        )
+
+    est = ty.estimate(mlp(), (3, 2, 5), dtype=torch.float16)
+    flatten, linear_1, relu, dropout, linear_2 = est.layers
+
+    assert flatten.activation_bytes == 0
+
+    assert linear_1.params == 10 * 16 + 16
+    assert linear_1.macs == 3 * 16 * 10
+    assert linear_1.activation_bytes == 3 * 16 * 2
+
+    # The output, plus a one-byte mask per element.
+    assert dropout.activation_bytes == 3 * 16 * 2 + 3 * 16
+
+    assert linear_2.params == 16 * 4 + 4
+    assert linear_2.macs == 3 * 4 * 16
+
+def test_estimate_dropout_eval():
+    est = ty.estimate(
+            [nn.Linear(4, 8), nn.Dropout().eval()],
+            (3, 4),
+    )
+    linear, dropout = est.layers
+
+    assert dropout.flops == 0
+    assert dropout.activation_bytes == 0
@@ -0,0 +1,85 @@
+import torch
+import torchyield as ty
+import pytest
+
+def mlp():
+    yield from ty.mlp_layer(
+            ty.linear_relu_dropout_layer,
+            **ty.channels([4, 8, 2]),
+            dropout_p=0.5,
+    )
+
+@pytest.mark.parametrize('format', ['torch.export', 'torchscript'])
+def test_export(tmp_path, format):
+    path = tmp_path / 'model.pt'
+    f = ty.module_from_layers(mlp()).eval()
+    x = torch.randn(3, 4)
+
+    artifact = ty.export(f, x, path, format=format)
+    assert path.exists()
+
+    g = artifact.module() if format == 'torch.export' else artifact
+    torch.testing.assert_close(g(x), f(x))
+
+@pytest.mark.parametrize('format', ['torch.export', 'torchscript'])
+def test_export_cached(tmp_path, format, monkeypatch):
+    path = tmp_path / 'model.pt'
+    x = torch.randn(3, 4)
+
+    ty.export(ty.module_from_layers(mlp()), x, path, format=format)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("unexpected re-export")
+
+    monkeypatch.setitem(ty.EXPORT_FORMATS, format, fail)
+
+    # Same structure, new weights: no need to re-export.
+    f = ty.module_from_layers(mlp()).eval()
+    artifact = ty.export(f, x, path, format=format)
+
+    g = artifact.module() if format == 'torch.export' else artifact
+    torch.testing.assert_close(g(x), f(x))
+
+    # Different input shape: must be re-exported.
+    with pytest.raises(AssertionError, match="unexpected re-export"):
+        ty.export(f, torch.randn(3, 4, dtype=torch.float64), path, format=format)
+
+def test_export_err_format(tmp_path):
+    with pytest.raises(ValueError, match="unknown export format: 'foo'"):
+        ty.export(mlp(), torch.randn(3, 4), tmp_path / 'model.pt', format='foo')
+
+def cnn():
+    yield from ty.conv2_bn_relu_layer(
+            in_channels=3,
+            out_channels=4,
+            kernel_size=3,
+    )
+    yield torch.nn.Flatten()
+    yield from ty.linear_layer(in_channels=4 * 3 * 3, out_channels=2)
+
+@pytest.mark.parametrize('format', ['torch.export', 'torchscript'])
+def test_export_nested_frozen(tmp_path, format):
+    path = tmp_path / 'model.pt'
+    f = ty.FrozenSequential([
+            ty.FrozenSequential(
+                cnn(),
+                memory_format='channels_last',
+                checkpoint_segments=2,
+            ),
+    ])
+    x = torch.randn(2, 3, 5, 5)
+
+    artifact = ty.export(f, x, path, format=format)
+
+    # The given modules aren't put into eval mode.
+    assert f.training
+    assert all(m.training for m in f.modules())
+
+    g = artifact.module() if format == 'torch.export' else artifact
+    torch.testing.assert_close(g(x), f.eval()(x))
+
+def test_export_err_autocast(tmp_path):
+    f = ty.FrozenSequential(mlp(), autocast=torch.bfloat16)
+
+    with pytest.raises(ValueError, match="can't export a `FrozenSequential` that uses autocast"):
+        ty.export(f, torch.randn(3, 4), tmp_path / 'model.pt')
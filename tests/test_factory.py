@@ -1,3 +1,4 @@
+import torch
 import torch.nn as nn
 import torchyield as ty
 import pytest
@@ -374,6 +375,53 @@ def test_conv2_avgpool_skip():
     assert conv.out_channels == 2
     assert conv.kernel_size == (3, 3)
 
+def test_conv2_bn_relu_dtype():
+    conv, bn, relu = ty.conv2_bn_relu_layer(
+            in_channels=1,
+            out_channels=2,
+            kernel_size=3,
+            device='cpu',
+            dtype=torch.bfloat16,
+    )
+
+    assert isinstance(conv, nn.Conv2d)
+    assert conv.weight.dtype == torch.bfloat16
+    assert conv.weight.device == torch.device('cpu')
+
+    assert isinstance(bn, nn.BatchNorm2d)
+    assert bn.weight.dtype == torch.bfloat16
+    assert bn.running_mean.dtype == torch.bfloat16
+
+    assert isinstance(relu, nn.ReLU)
+
+def test_linear_device_meta():
+    linear, = ty.linear_layer(
+            in_channels=1,
+            out_channels=2,
+            device='meta',
+    )
+
+    assert isinstance(linear, nn.Linear)
+    assert linear.weight.is_meta
+
+def test_relu_dtype():
+    relu, = ty.relu_layer(dtype=torch.float64, device='cpu')
+    assert isinstance(relu, nn.ReLU)
+
+def test_relu_err_dtype():
+    with pytest.raises(
+            TypeError,
+            match=r"relu_layer\(\) got invalid dtype: 'float16'",
+    ):
+        _, = ty.relu_layer(dtype='float16')
+
+def test_relu_err_device():
+    with pytest.raises(
+            ValueError,
+            match=r"relu_layer\(\) got invalid device: 'not_a_device'",
+    ):
+        _, = ty.relu_layer(device='not_a_device')
+
 
 def test_err_unknown_module():
     with pytest.raises(
@@ -397,3 +445,148 @@ def test_err_unused_arg():
         )
 
 
+
+def test_factory_cached():
+    assert ty.conv2_bn_relu_layer is ty.conv2_bn_relu_layer
+
+def test_factory_reusable():
+    f = ty.linear_bn_layer
+
+    linear_1, bn_1 = f(in_channels=1, out_channels=2)
+    linear_2, bn_2 = f(in_channels=3, out_channels=4, bias=True)
+
+    assert linear_1.in_features == 1
+    assert linear_1.out_features == 2
+    assert linear_1.bias is None
+    assert bn_1.num_features == 2
+
+    assert linear_2.in_features == 3
+    assert linear_2.out_features == 4
+    assert linear_2.bias is not None
+    assert bn_2.num_features == 4
+
+def test_init():
+    linear, relu = ty.linear_relu_layer(
+            in_channels=2,
+            out_channels=3,
+            init='xavier_normal',
+    )
+    assert isinstance(linear, nn.Linear)
+    assert not linear.weight.is_meta
+    assert torch.all(linear.bias == 0)
+
+def test_init_err():
+    with pytest.raises(
+            ValueError,
+            match=r"linear_layer\(\) got unknown initialization: 'foo'",
+    ):
+        _, = ty.linear_layer(in_channels=2, out_channels=3, init='foo')
+
+def test_dwconv2_bn():
+    conv, bn = ty.dwconv2_bn_layer(
+            in_channels=4,
+            out_channels=8,
+            kernel_size=3,
+    )
+
+    assert isinstance(conv, nn.Conv2d)
+    assert conv.in_channels == 4
+    assert conv.out_channels == 8
+    assert conv.groups == 4
+    assert conv.bias is None
+
+    assert isinstance(bn, nn.BatchNorm2d)
+    assert bn.num_features == 8
+
+def test_pwconv1():
+    conv, = ty.pwconv1_layer(
+            in_channels=4,
+            out_channels=8,
+    )
+
+    assert isinstance(conv, nn.Conv1d)
+    assert conv.kernel_size == (1,)
+    assert conv.groups == 1
+    assert conv.bias is not None
+
+def test_sepconv2_bn_relu_maxpool():
+    dw, pw, bn, relu, pool = ty.sepconv2_bn_relu_maxpool_layer(
+            in_channels=4,
+            out_channels=8,
+            kernel_size=3,
+            padding=1,
+            pool_size=2,
+    )
+
+    assert isinstance(dw, nn.Conv2d)
+    assert dw.in_channels == 4
+    assert dw.out_channels == 4
+    assert dw.groups == 4
+    assert dw.kernel_size == (3, 3)
+    assert dw.padding == (1, 1)
+    assert dw.bias is None
+
+    assert isinstance(pw, nn.Conv2d)
+    assert pw.in_channels == 4
+    assert pw.out_channels == 8
+    assert pw.groups == 1
+    assert pw.kernel_size == (1, 1)
+    assert pw.padding == (0, 0)
+    assert pw.bias is None
+
+    assert isinstance(bn, nn.BatchNorm2d)
+    assert bn.num_features == 8
+
+    assert isinstance(pool, nn.MaxPool2d)
+
+def test_sepconv2_make_layers():
+    f = ty.module_from_layers(
+            ty.make_layers(
+                ty.sepconv2_relu_layer,
+                **ty.channels(['auto', 8, 16]),
+                kernel_size=3,
+            ),
+            input_shape=(2, 3, 9, 9),
+    )
+
+    assert len(f) == 6
+    assert f[0].in_channels == 3
+    assert f[3].in_channels == 8
+    assert f[4].in_channels == 8
+
+    y = f(torch.randn(2, 3, 9, 9))
+    assert y.shape == (2, 16, 5, 5)
+
+def test_sepconv2_err_groups():
+    with pytest.raises(
+            TypeError,
+            match=r"sepconv2_layer\(\) got unexpected keyword argument\(s\): 'groups'",
+    ):
+        _, _ = ty.sepconv2_layer(
+                in_channels=4,
+                out_channels=8,
+                kernel_size=3,
+                groups=2,
+        )
+
+def test_sepconv2_err_channels():
+    with pytest.raises(
+            ValueError,
+            match=r"sepconv2_linear_layer\(\) has 'linear' after 'sepconv2' \(pointwise\)",
+    ):
+        _, _, _ = ty.sepconv2_linear_layer(
+                in_channels=4,
+                out_channels=8,
+                kernel_size=3,
+        )
+
+def test_dwconv2_err_channels():
+    with pytest.raises(
+            ValueError,
+            match=r"dwconv2_layer\(\) got out_channels=6, which isn't a multiple of in_channels=4",
+    ):
+        _, = ty.dwconv2_layer(
+                in_channels=4,
+                out_channels=6,
+                kernel_size=3,
+        )
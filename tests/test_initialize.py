@@ -0,0 +1,169 @@
+import torch
+import torch.nn as nn
+import torchyield as ty
+import pytest
+
+def test_materialize():
+    f = ty.module_from_layers(
+            ty.conv2_bn_relu_layer(
+                in_channels=1,
+                out_channels=2,
+                kernel_size=3,
+            ),
+            device='meta',
+    )
+
+    assert f[0].weight.is_meta
+    assert f[1].running_mean.is_meta
+
+    ty.materialize(f)
+
+    assert f[0].weight.device == torch.device('cpu')
+    assert f[0].weight.dtype == torch.float32
+    assert f[1].running_mean.device == torch.device('cpu')
+    assert torch.all(f[1].running_mean == 0)
+    assert torch.all(f[1].running_var == 1)
+
+    y = f(torch.randn(2, 1, 5, 5))
+    assert y.shape == (2, 2, 3, 3)
+
+def test_materialize_dtype():
+    f = ty.FrozenSequential(
+            ty.linear_bn_layer(in_channels=2, out_channels=3),
+            device='meta',
+    )
+    ty.materialize(f, dtype=torch.float64)
+    f = list(f.children())
+
+    assert f[0].weight.dtype == torch.float64
+    assert f[1].running_mean.dtype == torch.float64
+    assert f[1].num_batches_tracked.dtype == torch.long
+
+def test_materialize_init():
+    f = ty.module_from_layers(
+            ty.linear_layer(in_channels=2, out_channels=3),
+            device='meta',
+    )
+
+    def init(module):
+        if isinstance(module, nn.Linear):
+            nn.init.constant_(module.weight, 1)
+            nn.init.constant_(module.bias, 2)
+
+    ty.materialize(f, init=init)
+
+    assert torch.all(f.weight == 1)
+    assert torch.all(f.bias == 2)
+
+def test_materialize_load_state_dict():
+    f_ref = ty.module_from_layers(
+            ty.linear_relu_layer(in_channels=2, out_channels=3),
+    )
+    f = ty.module_from_layers(
+            ty.linear_relu_layer(in_channels=2, out_channels=3),
+            device='meta',
+    )
+    f.load_state_dict(f_ref.state_dict(), assign=True)
+
+    x = torch.randn(4, 2)
+    torch.testing.assert_close(f(x), f_ref(x))
+
+def test_materialize_err_init():
+    f = nn.Linear(2, 3, device='meta')
+
+    with pytest.raises(ValueError, match="unknown initialization: 'foo'"):
+        ty.materialize(f, init='foo')
+
+def test_materialize_skip():
+    f = ty.module_from_layers(
+            ty.linear_relu_layer(in_channels=2, out_channels=3),
+            init='skip',
+    )
+    assert f[0].weight.device == torch.device('cpu')
+    assert not f[0].weight.is_meta
+
+def test_mlp_layer_skip(monkeypatch):
+    reset = []
+    monkeypatch.setattr(
+            nn.Linear, 'reset_parameters',
+            lambda self: reset.append(self.weight.is_meta),
+    )
+
+    layers = list(ty.mlp_layer(
+            ty.linear_relu_layer,
+            **ty.channels([2, 3, 4]),
+            init='skip',
+    ))
+
+    # The parameters may be "reset" on the meta device, but never for real.
+    assert len(layers) == 3
+    assert all(reset)
+
+@pytest.mark.parametrize(
+        'init', ['kaiming_uniform', 'kaiming_normal', 'xavier_uniform'],
+)
+def test_init_parameters_threads(init):
+    def build(num_threads):
+        f = ty.module_from_layers(
+                ty.mlp_layer(
+                    ty.linear_bn_relu_layer,
+                    **ty.channels([4, 8, 8, 2]),
+                ),
+                device='meta',
+        )
+        ty.materialize(f, init=init, seed=1, num_threads=num_threads)
+        return f
+
+    f1 = build(1)
+    f4 = build(4)
+
+    torch.testing.assert_close(f1.state_dict(), f4.state_dict())
+
+    # Batch norm modules are reset normally.
+    assert torch.all(f1[1].weight == 1)
+    assert torch.all(f1[1].running_var == 1)
+
+def test_init_parameters_seed():
+    def build(**kwargs):
+        layer = nn.Linear(3, 4, device='meta')
+        ty.materialize(layer, init='kaiming_uniform', **kwargs)
+        return layer.weight
+
+    assert torch.equal(build(seed=1), build(seed=1))
+    assert not torch.equal(build(seed=1), build(seed=2))
+
+    torch.manual_seed(0)
+    w1 = build()
+
+    torch.manual_seed(0)
+    w2 = build()
+
+    assert torch.equal(w1, w2)
+
+def test_init_parameters_err_unknown():
+    with pytest.raises(ValueError, match="unknown initialization: 'foo'"):
+        ty.init_parameters(nn.Linear(1, 1), 'foo')
+
+def test_factory_init():
+    def build():
+        return ty.module_from_layers(
+                ty.mlp_layer(
+                    ty.linear_relu_layer,
+                    **ty.channels([2, 3, 4]),
+                    init='xavier_uniform',
+                ),
+        )
+
+    torch.manual_seed(0)
+    f1 = build()
+
+    torch.manual_seed(0)
+    f2 = build()
+
+    assert not f1[0].weight.is_meta
+    assert torch.all(f1[0].bias == 0)
+    torch.testing.assert_close(f1.state_dict(), f2.state_dict())
+
+    # Each module draws its own seed, so the modules aren't initialized with 
+    # the same random numbers.
+    assert not torch.equal(f1[0].weight[:, :2], f1[2].weight[:3, :2])
@@ -1,3 +1,4 @@
+import torch
 import torch.nn as nn
 import torchyield as ty
 import pytest
@@ -119,6 +120,25 @@ def test_make_layers_cycle():
             {'a': 4, 'b': 6},
     ]
 
+def test_make_layers_dtype():
+    layers = ty.make_layers(
+            ty.linear_relu_layer,
+            **ty.channels([1, 2, 3]),
+            dtype=torch.float64,
+    )
+    linear_1, relu_1, linear_2, relu_2 = layers
+
+    assert linear_1.weight.dtype == torch.float64
+    assert linear_2.weight.dtype == torch.float64
+
+def test_make_layers_dtype_unspecified():
+
+    def layer_factory(**kwargs):
+        yield kwargs
+
+    layers = ty.make_layers(layer_factory, a=[1, 2])
+    assert list(layers) == [{'a': 1}, {'a': 2}]
+
 
 def test_channels():
     assert ty.channels([1,2,3,4]) == dict(
@@ -132,3 +152,145 @@ def test_channels_keys():
             b=[2,3,4],
     )
 
+
+
+def test_mlp_layer_dtype():
+    layers = ty.mlp_layer(
+            ty.linear_relu_layer,
+            **ty.channels([1, 2, 3]),
+            dtype=torch.bfloat16,
+    )
+    linear_1, relu_1, linear_2 = layers
+
+    assert linear_1.weight.dtype == torch.bfloat16
+    assert linear_2.weight.dtype == torch.bfloat16
+    assert linear_2.bias.dtype == torch.bfloat16
+
+def test_frozen_sequential():
+    f = ty.FrozenSequential(
+            ty.linear_relu_layer(in_channels=2, out_channels=3),
+            nn.Linear(3, 1),
+    )
+    linear_1, relu, linear_2 = f.children()
+
+    x = torch.randn(4, 2)
+    torch.testing.assert_close(f(x), linear_2(relu(linear_1(x))))
+
+def test_frozen_sequential_args():
+
+    class Add(nn.Module):
+        def forward(self, x, y, *, z=0):
+            return x + y + z
+
+    f = ty.FrozenSequential(Add(), Add())
+
+    assert f(torch.tensor(1), 2) == 5
+    assert f(torch.tensor(1), 2, z=3) == 11
+
+@pytest.mark.parametrize('n', [1, 2, 3, 10])
+def test_frozen_sequential_checkpoint(n):
+
+    def layers():
+        yield from ty.make_layers(
+                ty.conv2_bn_relu_layer,
+                **ty.channels([2, 4, 4, 4]),
+                kernel_size=3,
+                padding=1,
+        )
+
+    torch.manual_seed(0)
+    f_ref = ty.FrozenSequential(layers())
+    torch.manual_seed(0)
+    f = ty.FrozenSequential(layers(), checkpoint_segments=n)
+
+    x = torch.randn(2, 2, 5, 5)
+    x_ref = x.clone().requires_grad_()
+    x = x.clone().requires_grad_()
+
+    f_ref(x_ref).sum().backward()
+    f(x).sum().backward()
+
+    torch.testing.assert_close(x.grad, x_ref.grad)
+
+    for p, p_ref in zip(f.parameters(), f_ref.parameters()):
+        torch.testing.assert_close(p.grad, p_ref.grad)
+
+    # Make sure the batch norm statistics were only updated once.
+    for b, b_ref in zip(f.buffers(), f_ref.buffers()):
+        torch.testing.assert_close(b, b_ref)
+
+def test_frozen_sequential_fuse_memory_format():
+
+    def layers():
+        yield from ty.make_layers(
+                ty.conv2_bn_relu_layer,
+                **ty.channels([2, 4, 4]),
+                kernel_size=3,
+                padding=1,
+        )
+
+    torch.manual_seed(0)
+    f_ref = ty.FrozenSequential(layers()).eval()
+    torch.manual_seed(0)
+    f = ty.FrozenSequential(
+            layers(),
+            fuse=True,
+            memory_format='channels_last',
+    ).eval()
+
+    assert len(list(f.children())) == 4
+
+    x = torch.randn(2, 2, 5, 5)
+    torch.testing.assert_close(f(x), f_ref(x))
+
+def _can_compile():
+    # Compilation requires a working C++ toolchain, which isn't available on 
+    # every platform.
+    try:
+        torch.compile(lambda x: x + 1)(torch.zeros(1))
+    except Exception:
+        return False
+    return True
+
+@pytest.mark.skipif(not _can_compile(), reason="torch.compile not available")
+def test_frozen_sequential_compile():
+
+    def layers():
+        yield from ty.make_layers(
+                ty.conv2_bn_relu_layer,
+                **ty.channels([2, 4, 4]),
+                kernel_size=3,
+                padding=1,
+        )
+
+    torch.manual_seed(0)
+    f_ref = ty.FrozenSequential(layers()).eval()
+    torch.manual_seed(0)
+    f = ty.FrozenSequential(layers(), compile=True).eval()
+
+    x = torch.randn(2, 2, 5, 5)
+    torch.testing.assert_close(f(x), f_ref(x))
+
+def test_frozen_sequential_checkpoint_segments():
+    f = ty.FrozenSequential(
+            ty.linear_relu_layer(in_channels=1, out_channels=1),
+            ty.linear_relu_layer(in_channels=1, out_channels=1),
+            checkpoint_segments=4,
+    )
+    linear_1, relu_1, linear_2, relu_2 = f.children()
+
+    assert f._segments == (
+            (linear_1, relu_1),
+            (linear_2, relu_2),
+    )
+
+def test_module_from_layers_checkpoint():
+    f = ty.module_from_layers(
+            ty.linear_relu_layer(in_channels=2, out_channels=3),
+            checkpoint_segments=1,
+    )
+    assert isinstance(f, ty.FrozenSequential)
+
+    x = torch.randn(4, 2, requires_grad=True)
+    f(x).sum().backward()
+    assert x.grad.shape == (4, 2)
@@ -0,0 +1,95 @@
+import torch
+import torch.nn as nn
+import torchyield as ty
+import pytest
+
+def test_conv2_memory_format():
+    conv, relu = ty.conv2_relu_layer(
+            in_channels=2,
+            out_channels=3,
+            kernel_size=3,
+            memory_format='channels_last',
+    )
+    assert conv.weight.is_contiguous(memory_format=torch.channels_last)
+
+def test_conv3_memory_format():
+    conv, = ty.conv3_layer(
+            in_channels=2,
+            out_channels=3,
+            kernel_size=3,
+            memory_format='channels_last',
+    )
+    assert conv.weight.is_contiguous(memory_format=torch.channels_last_3d)
+
+def test_memory_format_err():
+    with pytest.raises(
+            ValueError,
+            match=r"conv2_layer\(\) got unknown memory format: 'foo'",
+    ):
+        _, = ty.conv2_layer(
+                in_channels=2,
+                out_channels=3,
+                kernel_size=3,
+                memory_format='foo',
+        )
+
+def test_frozen_sequential_memory_format():
+    def layers():
+        yield from ty.conv2_bn_relu_layer(
+                in_channels=3,
+                out_channels=4,
+                kernel_size=3,
+        )
+        yield from ty.conv2_layer(
+                in_channels=4,
+                out_channels=4,
+                kernel_size=3,
+        )
+
+    f = ty.FrozenSequential(layers(), memory_format='channels_last')
+    g = ty.module_from_layers(layers())
+    g.load_state_dict(f.state_dict())
+
+    x = torch.randn(2, 3, 8, 8)
+    y = f(x)
+
+    assert y.is_contiguous(memory_format=torch.channels_last)
+    torch.testing.assert_close(y, g(x))
+
+def test_find_layout_conversions():
+    def layers():
+        yield from ty.conv2_relu_layer(
+                in_channels=3,
+                out_channels=4,
+                kernel_size=3,
+        )
+        yield nn.Flatten()
+        yield from ty.linear_layer(
+                in_channels=4 * 6 * 6,
+                out_channels=2,
+        )
+
+    modules = list(ty.modules_from_layers(layers()))
+    conversions = ty.find_layout_conversions(modules, (2, 3, 8, 8))
+
+    assert conversions == [(2, modules[2])]
+
+def test_find_layout_conversions_preserved():
+    modules = [
+            *ty.conv2_bn_relu_layer(in_channels=3, out_channels=4, kernel_size=3),
+            nn.MaxPool2d(2),
+            nn.AdaptiveAvgPool2d(2),
+    ]
+    assert ty.find_layout_conversions(modules, (2, 3, 8, 8)) == []
+
+@pytest.mark.parametrize(
+        'shape, memory_format, expected', [
+            ((1, 2, 3, 4), 'channels_last', torch.channels_last),
+            ((1, 2, 3, 4, 5), 'channels_last', torch.channels_last_3d),
+            ((1, 2, 3, 4, 5), torch.channels_last, torch.channels_last_3d),
+            ((1, 2), 'channels_last', None),
+            ((1, 2), 'contiguous', torch.contiguous_format),
+        ],
+)
+def test_get_memory_format(shape, memory_format, expected):
+    assert ty.get_memory_format(memory_format, len(shape)) == expected
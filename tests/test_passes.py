@@ -0,0 +1,148 @@
+import torch
+import torch.nn as nn
+import torchyield as ty
+import pytest
+
+def randomize_bn(modules):
+    for module in modules:
+        if isinstance(module, nn.modules.batchnorm._BatchNorm):
+            n = module.num_features
+            module.running_mean.copy_(torch.randn(n))
+            module.running_var.copy_(torch.rand(n) + 0.5)
+            if module.affine:
+                nn.init.normal_(module.weight)
+                nn.init.normal_(module.bias)
+
+@pytest.mark.parametrize(
+        'layer, x', [
+            (
+                ty.conv2_bn_relu_layer(
+                    in_channels=2,
+                    out_channels=3,
+                    kernel_size=3,
+                ),
+                torch.randn(4, 2, 5, 5),
+            ),
+            (
+                ty.conv1_bn_relu_layer(
+                    in_channels=2,
+                    out_channels=4,
+                    kernel_size=3,
+                    groups=2,
+                    bias=True,
+                    bn_affine=False,
+                ),
+                torch.randn(4, 2, 5),
+            ),
+            (
+                ty.linear_bn_relu_layer(
+                    in_channels=2,
+                    out_channels=3,
+                ),
+                torch.randn(4, 2),
+            ),
+        ],
+)
+def test_fuse(layer, x):
+    f = ty.module_from_layers(layer)
+    randomize_bn(f)
+    f.eval()
+
+    f_fused = ty.module_from_layers(ty.fuse(f.children()))
+
+    assert len(f_fused) == 2
+    assert not any(
+            isinstance(m, nn.modules.batchnorm._BatchNorm)
+            for m in f_fused
+    )
+    torch.testing.assert_close(f_fused(x), f(x))
+
+def test_fuse_no_running_stats():
+    modules = list(ty.conv2_bn_layer(
+            in_channels=2,
+            out_channels=3,
+            kernel_size=3,
+            bn_track_running_stats=False,
+    ))
+    assert list(ty.fuse(modules)) == modules
+
+def test_fuse_frozen_sequential():
+    f = ty.FrozenSequential(
+            ty.conv2_bn_relu_maxpool_layer(
+                in_channels=2,
+                out_channels=3,
+                kernel_size=3,
+                pool_size=2,
+            ),
+            fuse=True,
+    )
+
+    conv, relu, pool = f.children()
+
+    assert isinstance(conv, nn.Conv2d)
+    assert conv.bias is not None
+    assert isinstance(relu, nn.ReLU)
+    assert isinstance(pool, nn.MaxPool2d)
+
+def test_optimize():
+    relu = nn.ReLU()
+    linear = nn.Linear(2, 3)
+    layers = [
+            nn.Identity(),
+            nn.Sequential(
+                linear,
+                nn.Sequential(nn.Dropout(p=0), relu),
+            ),
+            nn.ReLU(),
+            nn.Dropout(p=0.5),
+    ]
+
+    assert list(ty.optimize(layers)) == [linear, relu, layers[3]]
+    assert list(ty.optimize(layers, inference=True)) == [linear, relu]
+
+def test_optimize_custom_pass():
+    def remove_relu(*layers):
+        for module in ty.modules_from_layers(*layers):
+            if not isinstance(module, nn.ReLU):
+                yield module
+
+    linear = nn.Linear(2, 3)
+    layers = [nn.Identity(), linear, nn.ReLU()]
+
+    assert list(ty.optimize(layers, passes=[remove_relu])) == \
+            [layers[0], linear]
+    assert list(ty.optimize(
+        layers, passes=[*ty.DEFAULT_PASSES, remove_relu],
+    )) == [linear]
+
+def test_merge_activations():
+    layers = [
+            nn.ReLU(),
+            nn.ReLU(),
+            nn.ReLU6(),
+            nn.Hardtanh(-1, 1),
+            nn.Hardtanh(-2, 2),
+            nn.Sigmoid(),
+            nn.Sigmoid(),
+    ]
+    assert list(ty.merge_activations(layers)) == [
+            layers[0],
+            layers[2],
+            layers[3],
+            layers[4],
+            layers[5],
+            layers[6],
+    ]
+
+def test_module_from_layers_passes():
+    f = ty.module_from_layers(
+            ty.linear_relu_dropout_layer(
+                in_channels=2,
+                out_channels=3,
+                dropout_p=0,
+            ),
+            passes=ty.DEFAULT_PASSES,
+    )
+    assert len(f) == 2
+    assert isinstance(f[0], nn.Linear)
+    assert isinstance(f[1], nn.ReLU)
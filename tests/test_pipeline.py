@@ -0,0 +1,77 @@
+import torch
+import torch.nn as nn
+import torchyield as ty
+import pytest
+
+def test_partition_params():
+    layers = [
+            nn.Linear(10, 10),  # 110
+            nn.ReLU(),
+            nn.Linear(10, 10),  # 110
+            nn.ReLU(),
+            nn.Linear(10, 20),  # 220
+            nn.ReLU(),
+    ]
+    stages = ty.partition(layers, 2)
+
+    assert stages == [layers[:4], layers[4:]]
+
+def test_partition_flops():
+    layers = [
+            nn.Conv2d(1, 4, 3),
+            nn.Conv2d(4, 4, 3),
+            nn.Flatten(),
+            nn.Linear(36, 1),
+    ]
+    stages = ty.partition(layers, 2, cost='flops', input_shape=(1, 1, 7, 7))
+
+    assert stages == [layers[:1], layers[1:]]
+
+def test_partition_callable():
+    layers = [nn.Identity() for _ in range(5)]
+    costs = dict(zip(map(id, layers), [1, 1, 1, 1, 4]))
+    stages = ty.partition(layers, 3, cost=lambda m: costs[id(m)])
+
+    assert stages == [layers[:3], layers[3:4], layers[4:]]
+
+def test_partition_one_module_per_stage():
+    layers = [nn.Linear(10, 10), nn.ReLU(), nn.ReLU()]
+    stages = ty.partition(layers, 3)
+
+    assert stages == [[layers[0]], [layers[1]], [layers[2]]]
+
+def test_partition_err_too_many_stages():
+    with pytest.raises(ValueError, match=r"can't divide 1 module\(s\) into 2 stage\(s\)"):
+        ty.partition(nn.ReLU(), 2)
+
+def test_partition_err_no_input_shape():
+    with pytest.raises(ValueError, match=r"cost='flops' requires `input_shape`"):
+        ty.partition([nn.ReLU(), nn.ReLU()], 2, cost='flops')
+
+def test_run_pipeline():
+    f = ty.module_from_layers(
+            ty.make_layers(
+                ty.linear_relu_layer,
+                **ty.channels([4, 8, 8, 8, 2]),
+            ),
+    ).eval()
+    stages = ty.partition(f.children(), 2)
+    xs = [torch.randn(3, 4) for _ in range(4)]
+
+    ys = list(ty.run_pipeline(stages, xs))
+
+    assert len(ys) == len(xs)
+    with torch.no_grad():
+        for x, y in zip(xs, ys):
+            torch.testing.assert_close(y, f(x))
+
+def test_run_pipeline_err_inputs():
+
+    def iter_inputs():
+        yield torch.randn(3, 4)
+        raise ZeroDivisionError("bad input")
+
+    stages = [[nn.Linear(4, 4)], [nn.ReLU()]]
+
+    with pytest.raises(ZeroDivisionError, match="bad input"):
+        list(ty.run_pipeline(stages, iter_inputs()))
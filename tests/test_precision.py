@@ -0,0 +1,64 @@
+import torch
+import torch.nn as nn
+import torchyield as ty
+
+class RecordDtype(nn.Module):
+
+    def __init__(self):
+        super().__init__()
+        self.dtypes = []
+
+    def forward(self, x):
+        self.dtypes.append(x.dtype)
+        return x
+
+def test_factory_fp32():
+    linear, bn, sigmoid = ty.linear_bn_sigmoid_layer(
+            in_channels=2,
+            out_channels=3,
+    )
+    assert not ty.is_fp32(linear)
+    assert ty.is_fp32(bn)
+    assert ty.is_fp32(sigmoid)
+
+def test_mlp_layer_fp32():
+    *hidden, output = ty.mlp_layer(
+            ty.linear_relu_layer,
+            **ty.channels([2, 3, 4]),
+    )
+    assert not any(ty.is_fp32(x) for x in hidden)
+    assert ty.is_fp32(output)
+
+def test_frozen_sequential_autocast():
+    a, b = RecordDtype(), ty.keep_fp32(RecordDtype())
+
+    def layers():
+        yield from ty.linear_layer(in_channels=2, out_channels=3)
+        yield a
+        yield b
+        yield from ty.linear_layer(in_channels=3, out_channels=4)
+
+    f = ty.FrozenSequential(layers(), autocast=torch.bfloat16)
+    y = f(torch.randn(5, 2))
+
+    assert a.dtypes == [torch.bfloat16]
+    assert b.dtypes == [torch.float32]
+    assert y.dtype == torch.bfloat16
+
+    # The parameters aren't converted, and the wrappers don't show up in the 
+    # state dict.
+    assert all(v.dtype == torch.float32 for v in f.state_dict().values())
+    assert set(f.state_dict()) == {'0.weight', '0.bias', '3.weight', '3.bias'}
+
+def test_module_from_layers_autocast():
+    f = ty.module_from_layers(
+            ty.mlp_layer(
+                ty.linear_relu_layer,
+                **ty.channels([2, 3, 4]),
+            ),
+            autocast=torch.bfloat16,
+    )
+    y = f(torch.randn(5, 2))
+
+    assert isinstance(f, ty.FrozenSequential)
+    assert y.dtype == torch.float32
@@ -0,0 +1,58 @@
+import torch
+import torch.nn as nn
+import torchyield as ty
+import json
+
+def test_module_from_layers_profile():
+    f = ty.module_from_layers(
+            ty.linear_relu_layer(in_channels=2, out_channels=3),
+            profile=True,
+    )
+
+    f(torch.randn(4, 2))
+    f(torch.randn(5, 2))
+
+    linear, relu = f.profiler.stats
+
+    assert linear.name == 'torchyield.0'
+    assert linear.module == 'Linear'
+    assert linear.calls == 2
+    assert linear.wall_time > 0
+    assert linear.output_shape == (5, 3)
+    assert linear.output_bytes == 5 * 3 * 4
+
+    assert relu.name == 'torchyield.1'
+    assert relu.module == 'ReLU'
+    assert relu.calls == 2
+
+    table = f.profiler.table()
+    assert 'torchyield.0' in table
+    assert 'Linear' in table
+
+    stats = json.loads(f.profiler.to_json())
+    assert stats[0]['calls'] == 2
+    assert stats[0]['output_shape'] == [5, 3]
+
+def test_profile_reset_remove():
+    f = nn.Sequential(nn.Linear(2, 3), nn.ReLU())
+    profiler = ty.profile(f.children())
+
+    f(torch.randn(4, 2))
+    assert profiler.stats[0].calls == 1
+
+    profiler.reset()
+    assert profiler.stats[0].calls == 0
+
+    profiler.remove()
+    f(torch.randn(4, 2))
+    assert profiler.stats[0].calls == 0
+
+def test_profile_record_function():
+    f = nn.Sequential(nn.Linear(2, 3), nn.ReLU())
+    ty.profile(f.children())
+
+    with torch.profiler.profile() as prof:
+        f(torch.randn(4, 2))
+
+    names = {e.name for e in prof.events()}
+    assert {'torchyield.0', 'torchyield.1'} <= names
@@ -0,0 +1,76 @@
+import torch
+import torch.nn as nn
+import torchyield as ty
+import pytest
+
+def cnn():
+    yield from ty.conv2_bn_relu_maxpool_layer(
+            in_channels=1,
+            out_channels=4,
+            kernel_size=3,
+            pool_size=2,
+    )
+    yield nn.Flatten()
+    yield from ty.linear_relu_layer(
+            in_channels=4 * 3 * 3,
+            out_channels=8,
+    )
+    yield from ty.linear_layer(
+            in_channels=8,
+            out_channels=2,
+    )
+
+def test_quantize_dynamic():
+    f = ty.module_from_layers(
+            ty.mlp_layer(
+                ty.linear_relu_layer,
+                **ty.channels([4, 8, 2]),
+            ),
+            quantize='dynamic',
+    )
+    assert not any(type(x) is nn.Linear for x in f.modules())
+
+    y = f(torch.randn(3, 4))
+    assert y.shape == (3, 2)
+    assert y.dtype == torch.float32
+
+def test_quantize_static():
+    x = torch.randn(16, 1, 8, 8)
+    f = ty.module_from_layers(
+            cnn(),
+            quantize='static',
+            calibration_data=x,
+    )
+
+    y = f(x)
+    assert y.shape == (16, 2)
+    assert y.dtype == torch.float32
+
+    report = f.quantization_report
+    assert report.max_abs_error >= report.mean_abs_error >= 0
+    assert report.float_time > 0
+    assert report.quantized_time > 0
+
+def test_quantize_training_mode_unchanged():
+    x = torch.randn(16, 1, 8, 8)
+    modules = list(ty.modules_from_layers(cnn()))
+
+    f = ty.quantize_modules(modules, 'static', x)
+    ty.compare_quantized(nn.Sequential(*modules), f, x)
+
+    assert all(m.training for m in modules)
+
+def test_quantize_err_no_calibration_data():
+    with pytest.raises(ValueError, match="requires calibration data"):
+        ty.module_from_layers(cnn(), quantize='static')
+
+def test_quantize_err_unknown_mode():
+    with pytest.raises(ValueError, match="unknown quantization mode: 'foo'"):
+        ty.module_from_layers(cnn(), quantize='foo')
+
+def test_find_fusable_modules():
+    modules = list(ty.modules_from_layers(cnn()))
+    assert ty.find_fusable_modules(modules) == [
+            ['0', '1', '2'],
+            ['5', '6'],
+    ]
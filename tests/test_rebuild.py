@@ -0,0 +1,82 @@
+import torch
+import torch.nn as nn
+import torchyield as ty
+import pytest
+
+def cnn(pool_size=2, out_channels=8):
+    yield from ty.conv2_bn_relu_maxpool_layer(
+            in_channels=1,
+            out_channels=4,
+            kernel_size=3,
+            pool_size=pool_size,
+    )
+    yield from ty.conv2_relu_layer(
+            in_channels=4,
+            out_channels=out_channels,
+            kernel_size=3,
+    )
+    yield nn.Flatten()
+    yield from ty.linear_layer(
+            in_channels='auto',
+            out_channels=2,
+    )
+
+def test_rebuild():
+    old = ty.module_from_layers(cnn(), input_shape=(1, 1, 12, 12))
+    new = ty.rebuild(old, cnn(pool_size=3), input_shape=(1, 1, 12, 12))
+
+    assert len(new) == 8
+
+    # Prefix: conv, bn, relu
+    for i in range(3):
+        assert new[i] is old[i]
+
+    # Changed: the pooling layer, and everything that depends on its output 
+    # shape (i.e. the final linear layer).
+    assert new[3] is not old[3]
+    assert new[3].kernel_size == 3
+    assert new[7] is not old[7]
+    assert new[7].in_features == 8
+    assert not new[7].weight.is_meta
+
+    y = new(torch.randn(1, 1, 12, 12))
+    assert y.shape == (1, 2)
+
+def test_rebuild_suffix():
+    old = ty.module_from_layers(cnn(out_channels=8), input_shape=(1, 1, 12, 12))
+    new = ty.rebuild(
+            old,
+            ty.linear_layer(in_channels=8, out_channels=8),
+            *list(old.children())[-1:],
+    )
+
+    assert new[0] is not old[0]
+    assert new[1] is old[-1]
+
+def test_rebuild_unchanged():
+    old = ty.module_from_layers(cnn(), input_shape=(1, 1, 12, 12))
+    new = ty.rebuild(old, cnn(), input_shape=(1, 1, 12, 12))
+
+    assert all(a is b for a, b in zip(new, old))
+
+def test_rebuild_init():
+    old = ty.module_from_layers(cnn(), input_shape=(1, 1, 12, 12))
+    state_dict = {k: v.clone() for k, v in old.state_dict().items()}
+
+    new = ty.rebuild(
+            old,
+            cnn(pool_size=3),
+            input_shape=(1, 1, 12, 12),
+            init='kaiming_uniform',
+    )
+
+    # The reused modules keep their parameters.
+    assert new[0] is old[0]
+    torch.testing.assert_close(new[0].weight, state_dict['0.weight'])
+    assert not new[7].weight.is_meta
+
+def test_rebuild_err_cache_dir(tmp_path):
+    old = ty.module_from_layers(cnn(), input_shape=(1, 1, 12, 12))
+
+    with pytest.raises(ValueError, match="can't rebuild a model using: cache_dir"):
+        ty.rebuild(old, cnn(), input_shape=(1, 1, 12, 12), cache_dir=tmp_path)
@@ -0,0 +1,111 @@
+import torch
+import torch.nn as nn
+import torchyield as ty
+import pytest
+
+def test_infer_shapes():
+    layers = list(ty.conv2_relu_maxpool_layer(
+            in_channels=3,
+            out_channels=8,
+            kernel_size=3,
+            pool_size=2,
+    ))
+    shapes = ty.infer_shapes(layers, (2, 3, 10, 10))
+
+    assert shapes == [
+            (layers[0], (2, 8, 8, 8)),
+            (layers[1], (2, 8, 8, 8)),
+            (layers[2], (2, 8, 4, 4)),
+    ]
+
+def test_infer_shapes_no_side_effects():
+    bn = nn.BatchNorm1d(2)
+    ty.infer_shapes(bn, (3, 2))
+
+    assert not bn.running_mean.is_meta
+    assert bn.num_batches_tracked == 0
+    assert torch.all(bn.running_mean == 0)
+
+def test_infer_shapes_err():
+    with pytest.raises(ValueError, match=r"layer 1 can't accept input of shape \(2, 3\)"):
+        ty.infer_shapes([nn.Linear(2, 3), nn.Linear(2, 3)], (2, 2))
+
+def test_module_from_layers_auto():
+
+    def cnn():
+        yield from ty.conv2_relu_layer(
+                in_channels='auto',
+                out_channels=4,
+                kernel_size=3,
+        )
+        yield nn.Flatten()
+        yield from ty.mlp_layer(
+                ty.linear_bn_relu_layer,
+                **ty.channels(['auto', 8, 2]),
+        )
+
+    f = ty.module_from_layers(cnn(), input_shape=(2, 3, 5, 5))
+
+    assert isinstance(f[0], nn.Conv2d)
+    assert f[0].in_channels == 3
+
+    assert isinstance(f[3], nn.Linear)
+    assert f[3].in_features == 4 * 3 * 3
+    assert f[3].out_features == 8
+
+    assert isinstance(f[6], nn.Linear)
+    assert f[6].in_features == 8
+
+    assert f(torch.randn(2, 3, 5, 5)).shape == (2, 2)
+
+def test_factory_err_auto():
+    with pytest.raises(ValueError, match=r"linear_layer\(\) can't infer `in_channels`"):
+        _, = ty.linear_layer(in_channels='auto', out_channels=2)
+
+@pytest.mark.parametrize(
+        'module, input_shape', [
+            (nn.Linear(3, 4), (2, 3)),
+            (nn.Linear(3, 4), (2, 5, 3)),
+            (nn.Conv1d(2, 4, 3), (2, 2, 7)),
+            (nn.Conv1d(2, 4, 3), (2, 7)),
+            (nn.Conv2d(3, 96, 11, stride=4), (1, 3, 227, 227)),
+            (nn.Conv2d(2, 4, 3, padding='same', dilation=2), (1, 2, 9, 9)),
+            (nn.Conv2d(2, 4, 3, padding='valid'), (1, 2, 9, 9)),
+            (nn.Conv3d(2, 4, (1, 2, 3), stride=(3, 2, 1), padding=1), (1, 2, 9, 9, 9)),
+            (nn.MaxPool1d(3, stride=2), (1, 2, 10)),
+            (nn.MaxPool2d(3, stride=2), (1, 2, 55, 55)),
+            (nn.MaxPool2d(3, stride=2, ceil_mode=True), (1, 2, 10, 10)),
+            (nn.MaxPool2d(2, padding=1, dilation=2), (1, 2, 9, 9)),
+            (nn.MaxPool3d((1, 2, 3)), (1, 2, 9, 9, 9)),
+            (nn.AvgPool1d(2), (1, 2, 9)),
+            (nn.AvgPool2d(3, stride=3, padding=1, ceil_mode=True), (1, 2, 6, 6)),
+            (nn.AvgPool3d(2), (1, 2, 5, 5, 5)),
+            (nn.BatchNorm1d(3), (2, 3)),
+            (nn.BatchNorm2d(3), (2, 3, 4, 4)),
+            (nn.Flatten(), (2, 3, 4, 5)),
+            (nn.Flatten(0, 1), (2, 3, 4, 5)),
+            (nn.ReLU(), (2, 3)),
+            (nn.Dropout(), (2, 3)),
+            (nn.Softmax(dim=1), (2, 3)),
+        ],
+)
+def test_output_shape(module, input_shape):
+    with torch.no_grad():
+        expected = module(torch.randn(input_shape)).shape
+
+    assert ty.output_shape(module, input_shape) == expected
+
+@pytest.mark.parametrize(
+        'module, input_shape, error', [
+            (nn.Linear(3, 4), (2, 4), "expected 3 input features"),
+            (nn.Conv2d(3, 4, 3), (2, 4, 5, 5), "expected 3 input channels"),
+            (nn.Conv2d(3, 4, 3), (2, 4, 5), "expected 3 input channels"),
+            (nn.Conv2d(3, 4, 3), (2, 4), "expected 3D or 4D input"),
+            (nn.Conv2d(3, 4, 3), (1, 2, 3, 5, 5), "expected 3D or 4D input"),
+            (nn.Conv2d(3, 4, 3), (2, 3, 2, 2), "input is too small"),
+            (nn.BatchNorm2d(3), (2, 4, 5, 5), "expected 3 input channels"),
+        ],
+)
+def test_output_shape_err(module, input_shape, error):
+    with pytest.raises(ValueError, match=error):
+        ty.output_shape(module, input_shape)
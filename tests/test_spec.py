@@ -0,0 +1,167 @@
+import torch
+import torch.nn as nn
+import torchyield as ty
+import torchyield.spec as tys
+import subprocess
+import sys
+
+def test_spec_factory():
+    spec = tys.conv2_relu_layer(
+            in_channels=1,
+            out_channels=2,
+            kernel_size=[3, 5],
+            dtype=torch.bfloat16,
+    )
+
+    assert spec == tys.Spec(
+            'conv2_relu_layer',
+            (
+                ('dtype', 'bfloat16'),
+                ('in_channels', 1),
+                ('kernel_size', (3, 5)),
+                ('out_channels', 2),
+            ),
+    )
+    assert hash(spec) == hash(tys.conv2_relu_layer(
+            kernel_size=(3, 5),
+            out_channels=2,
+            in_channels=1,
+            dtype='bfloat16',
+    ))
+
+def test_spec_make_layers():
+    specs = tys.make_layers(
+            tys.linear_relu_layer,
+            **tys.channels([1, 2, 3]),
+    )
+    assert specs == (
+            tys.linear_relu_layer(in_channels=1, out_channels=2),
+            tys.linear_relu_layer(in_channels=2, out_channels=3),
+    )
+
+    # The regular `make_layers()` works with spec factories, too.
+    assert tuple(ty.make_layers(
+            tys.linear_relu_layer,
+            **ty.channels([1, 2, 3]),
+    )) == specs
+
+def test_spec_mlp_layer():
+    specs = tys.mlp_layer(
+            tys.linear_relu_layer,
+            **tys.channels([1, 2, 3]),
+    )
+    assert specs == (
+            tys.linear_relu_layer(in_channels=1, out_channels=2),
+            tys.linear_layer(
+                in_channels=2,
+                out_channels=3,
+                bias=True,
+                keep_fp32=True,
+            ),
+    )
+
+def test_spec_json():
+    specs = (
+            tys.conv2_relu_layer(in_channels=1, out_channels=2, kernel_size=3),
+            tys.module('torch.nn.Flatten', start_dim=1),
+    )
+
+    assert tys.from_json(tys.to_json(specs)) == specs
+    assert tys.from_json(tys.to_json(specs[0])) == specs[0]
+
+def test_spec_key():
+    specs_1 = tys.make_layers(tys.linear_relu_layer, **tys.channels([1, 2, 3]))
+    specs_2 = tys.make_layers(tys.linear_relu_layer, **tys.channels([1, 2, 3]))
+    specs_3 = tys.make_layers(tys.linear_relu_layer, **tys.channels([1, 2, 4]))
+
+    assert tys.key(specs_1) == tys.key(specs_2)
+    assert tys.key(specs_1) != tys.key(specs_3)
+
+def test_build():
+    specs = (
+            *tys.make_layers(
+                tys.conv2_relu_layer,
+                **tys.channels([1, 2]),
+                kernel_size=3,
+                dtype=torch.float64,
+            ),
+            tys.module('torch.nn.Flatten'),
+            tys.linear_layer(in_channels='auto', out_channels=1),
+    )
+    f = ty.module_from_layers(ty.build(specs), input_shape=(1, 1, 5, 5))
+
+    assert isinstance(f[0], nn.Conv2d)
+    assert f[0].weight.dtype == torch.float64
+    assert isinstance(f[1], nn.ReLU)
+    assert isinstance(f[2], nn.Flatten)
+    assert isinstance(f[3], nn.Linear)
+    assert f[3].in_features == 2 * 3 * 3
+
+def test_build_mlp_layer():
+    kwargs = dict(
+            **ty.channels([2, 4, 3]),
+            init='xavier_uniform',
+            memory_format='channels_last',
+            dtype=torch.float64,
+    )
+
+    torch.manual_seed(0)
+    f = ty.module_from_layers(
+            ty.build(tys.mlp_layer(tys.linear_relu_layer, **kwargs)),
+    )
+    torch.manual_seed(0)
+    g = ty.module_from_layers(ty.mlp_layer(ty.linear_relu_layer, **kwargs))
+
+    assert repr(f) == repr(g)
+    assert [ty.is_fp32(x) for x in f] == [ty.is_fp32(x) for x in g]
+    assert ty.is_fp32(f[-1])
+    torch.testing.assert_close(f.state_dict(), g.state_dict())
+
+def test_spec_without_torch():
+    code = '''\
+import sys
+sys.modules['torch'] = None
+
+import torchyield as ty
+import torchyield.spec as tys
+
+specs = tys.make_layers(tys.linear_relu_layer, **tys.channels([1, 2, 3]))
+print(tys.key(specs))
+'''
+    subprocess.run([sys.executable, '-c', code], check=True)
+
+def test_lazy_submodules():
+    code = '''\
+import sys
+import torchyield as ty
+
+ty.linear_layer
+assert 'torchyield.pipeline' not in sys.modules
+assert 'torchyield.quantization' not in sys.modules
+
+ty.run_pipeline
+assert 'torchyield.pipeline' in sys.modules
+assert callable(ty.ensemble)
+'''
+    subprocess.run([sys.executable, '-c', code], check=True)
+
+def test_public_names():
+    from importlib import import_module
+    from collections import Counter
+
+    submodules = [*ty._SUBMODULES, *ty._LAZY_SUBMODULES]
+    names = Counter()
+
+    for name in submodules:
+        module = import_module(f'torchyield.{name}')
+        names.update(module.__all__)
+
+        if name in ty._LAZY_SUBMODULES:
+            assert ty._LAZY_SUBMODULES[name] == module.__all__
+
+    # No two submodules export the same name.
+    assert [k for k, v in names.items() if v > 1] == []
+
+    # Imports aren't exported.
+    assert not hasattr(ty, 'json')
+    assert ty.DROPOUT_MODULES is ty.module_types.DROPOUT_MODULES
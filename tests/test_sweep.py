@@ -0,0 +1,67 @@
+import torchyield as ty
+import pytest
+
+def cnn(kernel_size, pool_size):
+    yield from ty.conv2_relu_maxpool_layer(
+            in_channels=1,
+            out_channels=4,
+            kernel_size=kernel_size,
+            pool_size=pool_size,
+    )
+
+@pytest.mark.parametrize('workers', [0, 2])
+def test_sweep(workers):
+    results = ty.sweep(
+            cnn,
+            dict(kernel_size=[3, 9], pool_size=[1, 2]),
+            (1, 1, 8, 8),
+            workers=workers,
+            repeat=2,
+    )
+    results = {
+            (x.hparams['kernel_size'], x.hparams['pool_size']): x
+            for x in results
+    }
+
+    assert set(results) == {(3, 1), (3, 2), (9, 1), (9, 2)}
+
+    for k in [(3, 1), (3, 2)]:
+        assert results[k].error is None
+        assert results[k].params == 4 * 9 + 4
+        assert results[k].flops > 0
+        assert results[k].latency > 0
+
+    assert results[3, 2].flops > results[3, 1].flops
+
+    for k in [(9, 1), (9, 2)]:
+        assert results[k].params is None
+        assert "can't accept input of shape" in results[k].error
+
+def test_sweep_candidates():
+    results = list(ty.sweep(
+            cnn,
+            [dict(kernel_size=3, pool_size=2)],
+            (1, 1, 8, 8),
+            workers=0,
+    ))
+    assert len(results) == 1
+    assert results[0].hparams == dict(kernel_size=3, pool_size=2)
+    assert results[0].error is None
+
+def cnn_or_fail(kernel_size):
+    if kernel_size == 5:
+        raise KeyError('kernel_size')
+    yield from cnn(kernel_size, pool_size=1)
+
+def test_sweep_err():
+    results = ty.sweep(
+            cnn_or_fail,
+            dict(kernel_size=[3, 5]),
+            (1, 1, 8, 8),
+            workers=0,
+            repeat=1,
+    )
+    results = {x.hparams['kernel_size']: x for x in results}
+
+    assert results[3].error is None
+    assert results[5].error == "KeyError: 'kernel_size'"
@@ -0,0 +1,61 @@
+import torch
+import torch.nn as nn
+import torchyield as ty
+
+def test_module_from_layers_verbose(capsys):
+    f = ty.module_from_layers(
+            ty.linear_relu_layer(in_channels=2, out_channels=3),
+            verbose=True,
+    )
+
+    # The hooks shouldn't affect the structure of the model.
+    assert list(f.state_dict()) == ['0.weight', '0.bias']
+
+    f(torch.randn(4, 2))
+    out = capsys.readouterr().out
+
+    assert 'Linear(in_features=2, out_features=3, bias=True)\nin: torch.Size([4, 2])' in out
+    assert 'ReLU(inplace=True)\nin: torch.Size([4, 3])' in out
+
+    f.verbose_hooks.remove()
+    f(torch.randn(4, 2))
+
+    assert capsys.readouterr().out == ''
+
+def test_module_from_layers_verbose_kwargs(capsys):
+    f = ty.module_from_layers(
+            ty.linear_relu_layer(in_channels=2, out_channels=3),
+            verbose=dict(first=1, template='{0.__class__.__name__}'),
+    )
+
+    f(torch.randn(4, 2))
+    f(torch.randn(4, 2))
+
+    assert capsys.readouterr().out.splitlines() == ['Linear', 'ReLU']
+
+def test_add_verbose_hooks_first(capsys):
+    f = nn.Sequential(nn.Linear(2, 3), nn.ReLU())
+    ty.add_verbose_hooks(f, first=2, template='{0.__class__.__name__} {1}')
+
+    for i in range(4):
+        f(torch.randn(i + 1, 2))
+
+    assert capsys.readouterr().out.splitlines() == [
+            'Linear torch.Size([1, 2])',
+            'ReLU torch.Size([1, 3])',
+            'Linear torch.Size([2, 2])',
+            'ReLU torch.Size([2, 3])',
+    ]
+
+def test_add_verbose_hooks_every(capsys):
+    f = nn.Linear(2, 3)
+    ty.add_verbose_hooks(f, every=2, template='{1}')
+
+    for i in range(5):
+        f(torch.randn(i + 1, 2))
+
+    assert capsys.readouterr().out.splitlines() == [
+            'torch.Size([1, 2])',
+            'torch.Size([3, 2])',
+            'torch.Size([5, 2])',
+    ]
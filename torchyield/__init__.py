@@ -4,10 +4,131 @@ Make PyTorch models using generator functions.
 
 __version__ = '0.4.0'
 
-from .layers import *
-from .verbose import *
-from .utils import *
+# Most of this package depends on `torch`, which takes a while to import.  To 
+# allow `torchyield.spec` to be used without importing `torch`, the rest of 
+# the package is only imported once one of its names is first accessed.
+_SUBMODULES = [
+        'layers',
+        'verbose',
+        'initialize',
+        'passes',
+        'shapes',
+        'profiling',
+        'estimate',
+        'cache',
+        'layout',
+        'precision',
+        'module_types',
+        'autotune',
+        'rebuild',
+        'utils',
+]
+
+# These submodules import expensive parts of `torch` (e.g. 
+# `torch.distributed`, `torch.ao.quantization`), so each is only imported 
+# once one of its own names is accessed.
+_LAZY_SUBMODULES = {
+        'pipeline': [
+            'partition',
+            'run_pipeline',
+            'run_pipeline_stage',
+        ],
+        'ensemble': [
+            'Ensemble',
+            'ensemble',
+        ],
+        'quantization': [
+            'CalibrationData',
+            'QuantizationReport',
+            'quantize_modules',
+            'find_fusable_modules',
+            'compare_quantized',
+            'FUSION_PATTERNS',
+        ],
+        'export': [
+            'export',
+            'EXPORT_FORMATS',
+        ],
+        'sweep': [
+            'Grid',
+            'SweepResult',
+            'sweep',
+            'evaluate_candidate',
+        ],
+}
+_LAZY_NAMES = {
+        name: submodule
+        for submodule, names in _LAZY_SUBMODULES.items()
+        for name in names
+}
+_loaded = False
+
+def _load():
+    global _loaded
+    from importlib import import_module
+
+    modules = [import_module(f'.{x}', __name__) for x in _SUBMODULES]
+
+    # Equivalent to `from .{x} import *` for each submodule, i.e. only the 
+    # names in each `__all__` are exported.  Note that this has to happen 
+    # after all of the submodules are imported, because importing a 
+    # submodule assigns it to an attribute of this package, and some 
+    # submodules have the same name as a function they contain (e.g.  
+    # `verbose`, `estimate`).
+    for module in modules:
+        globals().update({k: getattr(module, k) for k in module.__all__})
+
+    from .spec import build
+    globals()['build'] = build
+
+    _loaded = True
+
+def _load_lazy(submodule):
+    from importlib import import_module
+
+    module = import_module(f'.{submodule}', __name__)
+
+    # As above, importing the submodule may replace a function with the same 
+    # name (e.g. `ensemble`), so assign all of its names afterwards.
+    globals().update({
+            k: getattr(module, k)
+            for k in _LAZY_SUBMODULES[submodule]
+    })
+
+    return module
 
 def __getattr__(name):
+    if name == 'spec':
+        from . import spec
+        return spec
+
+    # Don't import everything just because some tool is checking for a 
+    # special attribute.
+    if name.startswith('__') and name != '__all__':
+        raise AttributeError(name)
+
+    if not _loaded:
+        _load()
+        if name in globals():
+            return globals()[name]
+
+    if name in _LAZY_NAMES:
+        _load_lazy(_LAZY_NAMES[name])
+        return globals()[name]
+
+    if name in _LAZY_SUBMODULES:
+        return _load_lazy(name)
+
+    if name == '__all__':
+        return [
+                *(k for k in globals() if not k.startswith('_')),
+                *(k for k in _LAZY_NAMES if k not in globals()),
+        ]
+
     from .factory import make_factory
     return make_factory(name)
+
+def __dir__():
+    if not _loaded:
+        _load()
+    return list({**globals(), **_LAZY_NAMES})
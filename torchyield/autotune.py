@@ -0,0 +1,243 @@
+import torch
+import torch.nn as nn
+import platform
+import json
+
+from .layers import Layer, FrozenSequential, modules_from_layers
+from .cache import get_structure_key, _save_atomic
+from .module_types import CONV_MODULES, DROPOUT_MODULES
+from copy import deepcopy
+from pathlib import Path
+from time import perf_counter
+from typing import Any
+
+__all__ = [
+        'autotune',
+        'build_variant',
+        'TUNING_OPTIONS',
+        'BLOCK_MODULES',
+        'VIEW_MODULES',
+]
+
+def autotune(
+        layers: Layer,
+        example_input: torch.Tensor,
+        *,
+        options: dict[str, list[Any]] | None = None,
+        cache_dir: str | Path | None = None,
+        repeat: int = 10,
+) -> FrozenSequential:
+    """
+    Find the fastest of several equivalent ways to evaluate each block of the 
+    given layers on the local CPU.
+
+    Arguments:
+        layers:
+            The layers to tune.  These are divided into blocks, each of which 
+            starts with a linear or convolutional module (e.g. the modules 
+            yielded by one call to ``conv2_bn_relu_layer()``).  Any modules 
+            before the first such module are part of the first block.
+
+        example_input:
+            An input to the layers.  The timings are specific to inputs of 
+            this shape and data type.
+
+        options:
+            The `FrozenSequential` arguments to tune, and the values to try 
+            for each.  The first value of each option is the baseline.  By 
+            default, `TUNING_OPTIONS` are used, i.e. the memory format, 
+            whether or not to fuse batch normalization, whether or not 
+            activations are evaluated in-place, and whether or not the block 
+            is compiled.  ``'inplace'`` isn't a `FrozenSequential` argument; 
+            it sets the ``inplace`` attribute of every module in the block, 
+            or leaves them as they are if `None`.  See `build_variant()`.
+
+        cache_dir:
+            If given, the chosen plan is saved in this directory, keyed by 
+            the structure of the layers, the shape and data type of the 
+            input, the options, and the CPU architecture.  The next time the 
+            same layers are tuned, the saved plan is used without measuring 
+            anything.
+
+        repeat:
+            The number of forward passes to time for each variant.  The 
+            fastest is used.
+
+    Returns:
+        A `FrozenSequential` containing one `FrozenSequential` per block, 
+        each built with the fastest plan for that block, in eval mode.  The 
+        plans themselves (one per block) are available via the 
+        ``tuning_plan`` attribute.
+
+    The blocks are tuned in order, and each block is timed on the output of 
+    the already-tuned blocks before it, so that e.g. the cost of converting 
+    between memory formats is attributed to the right block.  Within each 
+    block, the options are tuned one at a time, keeping the best value of 
+    each option found so far.  This requires far fewer measurements than 
+    trying every combination.  Note that some variants (e.g. fusion) are 
+    only equivalent in eval mode, so the tuned model is meant for inference.
+
+    Every variant is checked against the baseline for its block (using the 
+    default tolerances of `torch.testing.assert_close()`), and any variant 
+    that produces a different output is rejected, no matter how fast it is.  
+    Variants that fail to compile are skipped, since compilation isn't 
+    available everywhere, but any other error is raised.
+    """
+    if options is None:
+        options = TUNING_OPTIONS
+
+    modules = list(modules_from_layers(layers))
+    blocks = _split_blocks(modules)
+    path = None
+
+    if cache_dir is not None:
+        key = get_structure_key(
+                nn.ModuleList(modules),
+                tuple(example_input.shape),
+                str(example_input.dtype),
+                sorted(options.items()),
+                platform.machine(),
+                platform.processor(),
+        )
+        path = Path(cache_dir) / f'{key}.json'
+
+    if path is not None and path.exists():
+        plans = json.loads(path.read_text())
+    else:
+        plans = _search(blocks, example_input, options, repeat)
+
+        if path is not None:
+            plans_json = json.dumps(plans)
+            _save_atomic(path, lambda f: f.write(plans_json.encode()))
+
+    model = FrozenSequential([
+            build_variant(block, plan)
+            for block, plan in zip(blocks, plans, strict=True)
+    ]).eval()
+    model.tuning_plan = plans
+    return model
+
+def build_variant(
+        modules: list[nn.Module],
+        plan: dict[str, Any],
+) -> FrozenSequential:
+    """
+    Build a `FrozenSequential` from copies of the given modules, using the 
+    given plan (i.e. keyword arguments, plus ``'inplace'``).
+
+    If ``plan['inplace']`` is true, only modules that can't overwrite the 
+    input to the first module are made in-place.  That excludes any module 
+    whose input is the original input or a view of it, e.g. the first 
+    module, or a module after `nn.Identity`, `nn.Flatten`, or dropout in 
+    eval mode.
+    """
+    modules = deepcopy(modules)
+    plan = dict(plan)
+
+    if (inplace := plan.pop('inplace', None)) is not None:
+        _set_inplace(modules, inplace)
+
+    return FrozenSequential(modules, **plan).eval()
+
+def _split_blocks(modules):
+    blocks = [[]]
+
+    for module in modules:
+        if isinstance(module, BLOCK_MODULES) and blocks[-1]:
+            blocks.append([])
+        blocks[-1].append(module)
+
+    return blocks
+
+def _set_inplace(modules, inplace):
+    aliases_input = True
+
+    for module in modules:
+        if hasattr(module, 'inplace') and not (inplace and aliases_input):
+            module.inplace = inplace
+
+        # Track whether the output of this module might be the original 
+        # input, or a view of it.  In-place modules return their input, and 
+        # the view modules return a view of it (dropout only in eval mode, 
+        # which is the mode every variant is evaluated in).
+        aliases_input = aliases_input and (
+                getattr(module, 'inplace', False) or
+                isinstance(module, VIEW_MODULES)
+        )
+
+def _search(blocks, x, options, repeat):
+    plans = []
+
+    with torch.no_grad():
+        for block in blocks:
+            plan = {k: v[0] for k, v in options.items()}
+            best = build_variant(block, plan)
+            expected = best(x.clone())
+            best_time = _measure(best, x, repeat)
+
+            for key, values in options.items():
+                for value in values[1:]:
+                    candidate = plan | {key: value}
+                    variant = build_variant(block, candidate)
+
+                    # The model is compiled lazily, so compilation errors 
+                    # only show up when it's first called.  Compilation 
+                    # isn't available everywhere (e.g. it needs a C++ 
+                    # compiler), so just skip any variants that can't be 
+                    # compiled.
+                    try:
+                        y = variant(x.clone())
+                    except Exception:
+                        if not candidate.get('compile'):
+                            raise
+                        continue
+
+                    if not _is_close(y, expected):
+                        continue
+
+                    time = _measure(variant, x, repeat)
+
+                    if time < best_time:
+                        plan, best, best_time = candidate, variant, time
+
+            plans.append(plan)
+            x = best(x.clone())
+
+    return plans
+
+def _is_close(actual, expected):
+    try:
+        torch.testing.assert_close(actual, expected)
+    except AssertionError:
+        return False
+    return True
+
+def _measure(model, x, repeat):
+    best = float('inf')
+
+    with torch.no_grad():
+        # Warm up, e.g. to trigger compilation.  Clone the input in case the 
+        # model has in-place modules that the user enabled, so that the input 
+        # is the same for every variant.
+        model(x.clone())
+
+        for _ in range(repeat):
+            x_i = x.clone()
+            start = perf_counter()
+            model(x_i)
+            best = min(best, perf_counter() - start)
+
+    return best
+
+TUNING_OPTIONS = {
+        'memory_format': [None, 'channels_last'],
+        'fuse': [False, True],
+        'inplace': [None, True, False],
+        'compile': [False, True],
+}
+
+# Each block starts with one of these modules.
+BLOCK_MODULES = nn.Linear, *CONV_MODULES
+
+# These modules return their input, or a view of it.
+VIEW_MODULES = nn.Identity, nn.Flatten, nn.Unflatten, *DROPOUT_MODULES
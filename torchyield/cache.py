@@ -0,0 +1,144 @@
+import torch
+import torch.nn as nn
+import hashlib
+import os
+
+from .initialize import Init, materialize, check_init
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from collections.abc import Callable
+
+__all__ = [
+        'load_cached_modules',
+        'get_cache_key',
+        'get_structure_key',
+]
+
+def load_cached_modules(
+        build: Callable[[], list[nn.Module]],
+        cache_dir: str | Path,
+        seed: int,
+        init: Init = 'default',
+) -> list[nn.Module]:
+    """
+    Initialize the given modules from an on-disk cache, if possible.
+
+    Arguments:
+        build:
+            A function that constructs the modules.  This will be called on 
+            the meta device, so that no time is spent initializing 
+            parameters that will just be replaced by those in the cache.
+
+        cache_dir:
+            The directory where cached parameters are stored.  It will be 
+            created if necessary.
+
+        seed:
+            The random seed used to initialize the parameters, if they 
+            aren't already cached.
+
+        init:
+            How to initialize the parameters, if they aren't already cached.  
+            This must be the name of an initialization scheme, since 
+            arbitrary callables can't be included in the cache key.  It also 
+            can't be ``'skip'``, since there would be nothing worth caching.  
+            See `materialize()` for details.
+
+    Returns:
+        The constructed modules.  If a cache entry exists for these modules 
+        and this seed, the parameters and buffers are memory-mapped from that 
+        file.  This means that they are only read from disk when needed, and 
+        that processes on the same host that load the same entry will share 
+        the same physical memory (until they modify it).  Otherwise, the 
+        parameters are initialized with the given seed, and saved to the 
+        cache before being memory-mapped in the same way.
+
+    By default, parameters are initialized by calling `reset_parameters()` on 
+    each module, in order.  This is the same way that the built-in PyTorch 
+    modules initialize themselves when constructed, so the results are the 
+    same as if the modules had been constructed normally after calling 
+    `torch.manual_seed(seed)`.
+    """
+    check_init(init)
+    if not isinstance(init, str):
+        raise ValueError(f"can't cache parameters initialized by {init!r}\n• expected the name of an initialization scheme, e.g. 'default'")
+    if init == 'skip':
+        raise ValueError("can't cache parameters that are never initialized\n• either don't skip initialization, or don't specify a cache directory")
+
+    with torch.device('meta'):
+        modules = build()
+
+    container = nn.ModuleList(modules)
+    path = Path(cache_dir) / f'{get_cache_key(container, seed, init)}.pt'
+
+    if not path.exists():
+        with torch.random.fork_rng(devices=[]):
+            torch.manual_seed(seed)
+            materialize(container, init=init)
+
+        state_dict = container.state_dict()
+        _save_atomic(path, lambda f: torch.save(state_dict, f))
+
+    state_dict = torch.load(path, mmap=True, weights_only=True)
+    container.load_state_dict(state_dict, assign=True)
+
+    # Any tensors that aren't part of the state dict (e.g. non-persistent 
+    # buffers) will still be on the meta device, and need to be initialized 
+    # the normal way.  This replaces every tensor, so it's only a fallback.
+    if any(x.is_meta for x in _get_tensors(container)):
+        with torch.random.fork_rng(devices=[]):
+            torch.manual_seed(seed)
+            materialize(container, init=init)
+
+    return modules
+
+def get_cache_key(module: nn.Module, seed: int, init: str = 'default') -> str:
+    """
+    Return a hash that identifies the structure of the given module, and the 
+    seed and initialization scheme used to initialize it.
+
+    See `get_structure_key()` for what is included in the structure.
+    """
+    return get_structure_key(module, seed, init)
+
+def get_structure_key(module: nn.Module, *extra) -> str:
+    """
+    Return a hash that identifies the structure of the given module, and any 
+    other (hashable by `repr()`) values that should be part of the key.
+
+    The structure includes the type and hyperparameters (as reported by 
+    `repr()`) of each submodule, and the name, shape, and data type of each 
+    parameter and buffer, but not their values.  The PyTorch version is also 
+    included, since default initializations can change between versions.
+    """
+    h = hashlib.sha256()
+
+    def update(*args):
+        h.update(repr(args).encode())
+
+    update(torch.__version__, *extra)
+
+    for name, submodule in module.named_modules():
+        cls = type(submodule)
+        update(name, f'{cls.__module__}.{cls.__qualname__}', repr(submodule))
+
+    for name, x in module.state_dict(keep_vars=True).items():
+        update(name, tuple(x.shape), str(x.dtype))
+
+    return h.hexdigest()
+
+def _get_tensors(module):
+    yield from module.parameters()
+    yield from module.buffers()
+
+def _save_atomic(path, save, suffix='.tmp'):
+    # Write to a temporary file first, so that other processes never see a 
+    # partially written cache entry.  Some writers (e.g. `torch.export.save`) 
+    # care about the file extension, hence the *suffix* argument.
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    with NamedTemporaryFile(dir=path.parent, suffix=suffix, delete=False) as f:
+        save(f)
+
+    os.replace(f.name, path)
@@ -0,0 +1,250 @@
+import torch
+import torch.nn as nn
+import copy
+
+from .layers import LayerFactory, Device, module_from_layers
+from .params import broadcast_params
+from torch.func import stack_module_state, functional_call, vmap
+from collections.abc import Iterable
+
+__all__ = [
+        'Ensemble',
+        'ensemble',
+]
+
+class Ensemble(nn.Module):
+    """
+    Evaluate several copies of the same architecture in a single vectorized 
+    forward pass.
+
+    The parameters and buffers of the given members are stacked along a new 
+    leading dimension, and the forward pass is evaluated for every member at 
+    once using `torch.func.vmap`.  This is much faster than evaluating each 
+    member separately, especially for small models, because each operation 
+    is only dispatched once for the whole ensemble.
+
+    The stacked parameters are stored in the *module* attribute, which has 
+    the same structure as each member.  That means the state dict of the 
+    ensemble has the same keys as the state dict of each member, just with 
+    an extra leading dimension.  Use `member_state_dict()` and 
+    `load_member_state_dict()` to convert to and from individual checkpoints.
+
+    The members must all have the same architecture, except that dropout 
+    probabilities may differ.  These are stored as a buffer with one value 
+    per member, so that every member is still evaluated by the same `vmap` 
+    call.  Note that dropout is applied independently to each member.
+    """
+
+    def __init__(self, members: Iterable[nn.Module]):
+        super().__init__()
+
+        members = list(members)
+        if not members:
+            raise ValueError("can't create an ensemble with no members")
+
+        params, buffers = stack_module_state(members)
+
+        self.module = copy.deepcopy(members[0])
+        _assign_tensors(self.module, params, buffers)
+
+        tensors = [*params.values(), *buffers.values()]
+        device = tensors[0].device if tensors else None
+
+        for name, dropout_p in _find_dropout_ps(members).items():
+            submodule = self.module.get_submodule(name)
+            _make_ensemble_dropout(submodule, dropout_p, device)
+
+        self._num_members = len(members)
+
+    def __len__(self):
+        return self._num_members
+
+    def forward(self, x, *, in_dim: int | None = None):
+        """
+        Evaluate every member of the ensemble.
+
+        Arguments:
+            x:
+                The input.  By default, every member gets the same input.
+            in_dim:
+                If given, the dimension of *x* that indexes the members, 
+                i.e. member *i* gets ``x.select(in_dim, i)`` as its input.
+
+        Returns:
+            The stacked outputs of every member, with the members indexed by 
+            the first dimension.
+        """
+        params = dict(self.module.named_parameters())
+        buffers = dict(self.module.named_buffers())
+
+        def call(params, buffers, x):
+            return functional_call(self.module, (params, buffers), (x,))
+
+        return vmap(
+                call,
+                in_dims=(0, 0, in_dim),
+                randomness='different',
+        )(params, buffers, x)
+
+    def member_state_dict(self, i: int) -> dict[str, torch.Tensor]:
+        """
+        Return the state dict of the *i*-th member, in the same format as if 
+        that member was a standalone module.
+        """
+        return {
+                k: v[i].clone()
+                for k, v in self.module.state_dict().items()
+        }
+
+    def load_member_state_dict(
+            self,
+            i: int,
+            state_dict: dict[str, torch.Tensor],
+    ) -> None:
+        """
+        Replace the parameters and buffers of the *i*-th member with those 
+        from the given state dict, e.g. a checkpoint of a standalone module.
+        """
+        own_state_dict = self.module.state_dict()
+
+        if missing := own_state_dict.keys() - state_dict.keys():
+            raise ValueError(f"missing key(s) in state dict: {', '.join(map(repr, sorted(missing)))}")
+        if unexpected := state_dict.keys() - own_state_dict.keys():
+            raise ValueError(f"unexpected key(s) in state dict: {', '.join(map(repr, sorted(unexpected)))}")
+
+        with torch.no_grad():
+            for k, v in own_state_dict.items():
+                v[i].copy_(state_dict[k])
+
+def ensemble(
+        layer_factory: LayerFactory,
+        n: int | None = None,
+        *,
+        seed: int | None = None,
+        device: Device = None,
+        **params,
+) -> Ensemble:
+    """
+    Create an ensemble of models with the same architecture.
+
+    Arguments:
+        layer_factory:
+            A function that yields the layers of each member.
+
+        n:
+            The number of members.  This can be omitted if any of the 
+            *params* are lists, in which case there will be one member for 
+            each item in those lists.
+
+        seed:
+            If given, member *i* is initialized after calling 
+            ``torch.manual_seed(seed + i)``.  This means that each member 
+            will be identical to a model built separately with that seed. 
+            The global random number generator is not affected.
+
+        device:
+            The device to create the parameters on.
+
+        params:
+            Arguments to pass on to *layer_factory*.  These are broadcast in 
+            the same way as for `make_layers()`, so that scalar arguments are 
+            given to every member and list arguments are distributed between 
+            the members.
+
+    Returns:
+        An `Ensemble` module.
+    """
+    member_params = list(broadcast_params(params)) if params else [{}]
+
+    if n is not None:
+        if len(member_params) == 1:
+            member_params *= n
+        elif len(member_params) != n:
+            raise ValueError(f"expected {n} members, but got parameters for {len(member_params)}")
+
+    def make_member(i, kwargs):
+        if seed is None:
+            return module_from_layers(layer_factory(**kwargs), device=device)
+
+        with torch.random.fork_rng(devices=[]):
+            torch.manual_seed(seed + i)
+            return module_from_layers(layer_factory(**kwargs), device=device)
+
+    return Ensemble(
+            make_member(i, kwargs)
+            for i, kwargs in enumerate(member_params)
+    )
+
+class _EnsembleDropout(nn.Dropout):
+    """
+    Dropout with a different probability for each member of an ensemble.
+
+    The probabilities are stored in the ``ensemble_p`` buffer, which is 
+    stacked like any other buffer, so within `vmap` each member sees its own 
+    probability as a 0D tensor.
+    """
+
+    def forward(self, x):
+        if not self.training:
+            return x
+
+        p = self.ensemble_p.to(x.dtype)
+        keep = torch.rand_like(x) >= p
+
+        # Clamp the denominator to avoid dividing by zero when p=1.  In that 
+        # case every element is dropped anyway.
+        return x * (keep / (1 - p).clamp(min=torch.finfo(x.dtype).tiny))
+
+    def extra_repr(self):
+        return f'p={self.ensemble_p.tolist()}, inplace={self.inplace}'
+
+def _find_dropout_ps(members):
+    # Return the dropout probabilities of any submodules that differ between 
+    # members.  Only the submodule's own hyperparameters are compared (i.e. 
+    # `extra_repr()`), since the repr of a container includes its children.
+    names = [name for name, _ in members[0].named_modules()]
+    dropout_ps = {}
+
+    for member in members[1:]:
+        if [name for name, _ in member.named_modules()] != names:
+            raise ValueError("members of an ensemble must have the same architecture")
+
+    for name in names:
+        submodules = [x.get_submodule(name) for x in members]
+
+        if len({(type(x), x.extra_repr()) for x in submodules}) == 1:
+            continue
+
+        if {type(x) for x in submodules} == {nn.Dropout} and \
+                len({x.inplace for x in submodules}) == 1:
+            dropout_ps[name] = [x.p for x in submodules]
+            continue
+
+        reprs = dict.fromkeys(repr(x) for x in submodules)
+        raise ValueError(f"members of an ensemble must have the same architecture\n• only dropout probabilities can differ between members\n✖ submodule {name!r} differs: {', '.join(reprs)}")
+
+    return dropout_ps
+
+def _make_ensemble_dropout(module, dropout_p, device):
+    # Change the class in place, like `torch.nn.utils.parametrize` does, so 
+    # that any containers holding references to this module (e.g. 
+    # `FrozenSequential`) use the new forward pass.
+    module.__class__ = _EnsembleDropout
+    module.register_buffer(
+            'ensemble_p',
+            torch.tensor(dropout_p, device=device),
+            persistent=False,
+    )
+
+def _assign_tensors(module, params, buffers):
+    for name, value in params.items():
+        submodule, key = _get_owner(module, name)
+        setattr(submodule, key, nn.Parameter(value))
+
+    for name, value in buffers.items():
+        submodule, key = _get_owner(module, name)
+        setattr(submodule, key, value)
+
+def _get_owner(module, name):
+    prefix, _, key = name.rpartition('.')
+    return module.get_submodule(prefix), key
@@ -0,0 +1,177 @@
+import torch
+import torch.nn as nn
+
+from .layers import Layer
+from .shapes import infer_shapes
+from .module_types import CONV_MODULES, BATCH_NORM_MODULES, DROPOUT_MODULES
+from dataclasses import dataclass
+from math import prod
+
+__all__ = [
+        'LayerEstimate',
+        'Estimate',
+        'estimate',
+        'POOL_DIMENSIONS',
+        'FREE_MODULES',
+]
+
+@dataclass
+class LayerEstimate:
+    module: nn.Module
+    input_shape: torch.Size
+    output_shape: torch.Size
+    params: int
+    macs: int
+    flops: int
+    activation_bytes: int
+
+@dataclass
+class Estimate:
+    layers: list[LayerEstimate]
+
+    @property
+    def params(self):
+        return sum(x.params for x in self.layers)
+
+    @property
+    def macs(self):
+        return sum(x.macs for x in self.layers)
+
+    @property
+    def flops(self):
+        return sum(x.flops for x in self.layers)
+
+    @property
+    def activation_bytes(self):
+        return sum(x.activation_bytes for x in self.layers)
+
+def estimate(
+        layers: Layer,
+        input_shape: tuple[int, ...],
+        dtype: torch.dtype = torch.float32,
+) -> Estimate:
+    """
+    Estimate the cost of evaluating the given layers.
+
+    Arguments:
+        layers:
+            The layers to evaluate, e.g. the generator returned by a factory 
+            or by `make_layers()`.  Any modules that haven't been constructed 
+            yet will be constructed on the meta device, so no memory is 
+            allocated for any parameters.  Factories can use 
+            `in_channels='auto'`.
+
+        input_shape:
+            The shape of the input to the first layer, including the batch 
+            dimension.
+
+        dtype:
+            The data type of the activations, used to calculate how much 
+            memory they require.
+
+    Returns:
+        An `Estimate` object.  This has a list of per-layer estimates, and 
+        properties for the totals of each metric:
+
+        - ``params``: The number of parameters.
+        - ``macs``: The number of multiply-accumulate operations performed by 
+          linear and convolutional modules.
+        - ``flops``: The number of floating point operations.  This counts 
+          two operations for each MAC, and approximates the cost of other 
+          modules based on the size of their outputs.
+        - ``activation_bytes``: The memory needed for the output of each 
+          module.  Modules that operate in-place or return views (e.g. 
+          `nn.Flatten`) don't require any memory.  Dropout modules in 
+          training mode also require one byte per element for their masks.
+
+    Everything is calculated analytically from the shapes of the inputs and 
+    the hyperparameters of each module, so this is fast enough to compare 
+    many different architectures.
+    """
+    with torch.device('meta'):
+        shapes = infer_shapes(layers, input_shape)
+
+    in_shape = torch.Size(input_shape)
+    layer_estimates = []
+
+    for module, out_shape in shapes:
+        macs = _count_macs(module, out_shape)
+        layer_estimates.append(
+                LayerEstimate(
+                    module=module,
+                    input_shape=in_shape,
+                    output_shape=out_shape,
+                    params=sum(p.numel() for p in module.parameters()),
+                    macs=macs,
+                    flops=_count_flops(module, out_shape, macs),
+                    activation_bytes=_count_activation_bytes(
+                        module, out_shape, dtype,
+                    ),
+                )
+        )
+        in_shape = out_shape
+
+    return Estimate(layer_estimates)
+
+def _count_macs(module, out_shape):
+    if isinstance(module, nn.Linear):
+        return prod(out_shape) * module.in_features
+
+    if isinstance(module, CONV_MODULES):
+        k = prod(module.kernel_size) * module.in_channels // module.groups
+        return prod(out_shape) * k
+
+    return 0
+
+def _count_flops(module, out_shape, macs):
+    if macs:
+        return 2 * macs
+
+    if (dim := POOL_DIMENSIONS.get(type(module))) is not None:
+        kernel_size = module.kernel_size
+        if isinstance(kernel_size, int):
+            kernel_size = (kernel_size,) * dim
+        return prod(out_shape) * prod(kernel_size)
+
+    if isinstance(module, BATCH_NORM_MODULES):
+        return 2 * prod(out_shape)
+
+    if _is_free(module):
+        return 0
+
+    return prod(out_shape)
+
+def _count_activation_bytes(module, out_shape, dtype):
+    if _is_free(module):
+        return 0
+
+    n = prod(out_shape)
+
+    # In training mode, dropout also saves a boolean mask for the backward 
+    # pass.  This is allocated even if the dropout itself is in-place.
+    mask_bytes = n if isinstance(module, DROPOUT_MODULES) else 0
+
+    if getattr(module, 'inplace', False):
+        return mask_bytes
+
+    return n * dtype.itemsize + mask_bytes
+
+def _is_free(module):
+    if isinstance(module, FREE_MODULES):
+        return True
+
+    # Dropout is the identity function in eval mode.
+    if isinstance(module, DROPOUT_MODULES):
+        return not module.training or module.p == 0
+
+    return False
+
+POOL_DIMENSIONS = {
+        nn.MaxPool1d: 1,
+        nn.MaxPool2d: 2,
+        nn.MaxPool3d: 3,
+        nn.AvgPool1d: 1,
+        nn.AvgPool2d: 2,
+        nn.AvgPool3d: 3,
+}
+FREE_MODULES = nn.Identity, nn.Flatten
@@ -0,0 +1,180 @@
+import torch
+import torch.nn as nn
+
+from .layers import Layer, FrozenSequential, modules_from_layers
+from .layout import MemoryFormat, get_memory_format
+from .passes import optimize
+from .cache import get_structure_key, _save_atomic
+from copy import deepcopy
+from pathlib import Path
+
+__all__ = [
+        'export',
+        'EXPORT_FORMATS',
+]
+
+def export(
+        layers: Layer,
+        example_input: torch.Tensor,
+        path: str | Path,
+        *,
+        format: str = 'torch.export',
+):
+    """
+    Compile the given layers ahead of time, and save the result to disk.
+
+    Arguments:
+        layers:
+            The layers to export.  These are copied, so the given modules 
+            themselves aren't modified.  Any `FrozenSequential` modules (even 
+            nested ones, e.g. from `autotune()`) are replaced by their 
+            children, and the layers are simplified using `INFERENCE_PASSES`.  
+            The resulting modules are then exported as a plain 
+            `nn.Sequential` in eval mode, which is compatible with both 
+            `torch.export` and TorchScript.  If a `FrozenSequential` has a 
+            *memory_format*, its input is converted to that format by an 
+            explicit module.  Its *checkpoint_segments* are ignored, since 
+            they only affect the backward pass.  *autocast* can't be 
+            exported, so it raises a `ValueError`.
+
+        example_input:
+            An input to the model.  Only its shape and data type matter.
+
+        path:
+            Where to save the exported model.
+
+        format:
+            - ``'torch.export'``: Export the model with `torch.export.export()`, 
+              and save it with `torch.export.save()`.
+
+            - ``'torchscript'``: Compile the model with `torch.jit.script()`, 
+              and save it with `torch.jit.save()`.
+
+    Returns:
+        The exported model, i.e. an `ExportedProgram` or a `ScriptModule`.
+
+    The saved file records a hash of the model structure (see 
+    `get_structure_key()`) and the shape and data type of the example input. 
+    If *path* already contains a model with the same hash, that model is 
+    loaded and updated with the current parameters, instead of being exported 
+    again.  This is much faster for large models, where tracing and 
+    compiling can take a long time.
+    """
+    if format not in EXPORT_FORMATS:
+        raise ValueError(f"unknown export format: {format!r}\n• expected one of: {', '.join(map(repr, EXPORT_FORMATS))}")
+
+    modules = deepcopy(list(modules_from_layers(layers)))
+    model = nn.Sequential(*optimize(_expand_frozen(modules), inference=True))
+    model.eval()
+
+    key = get_structure_key(
+            model,
+            format,
+            tuple(example_input.shape),
+            str(example_input.dtype),
+    )
+    path = Path(path)
+
+    if path.exists():
+        artifact, cached_key = _load(path, format)
+
+        if cached_key == key:
+            if _copy_weights(_get_state_dict(artifact), model.state_dict()):
+                _save(path, artifact, format, key)
+            return artifact
+
+    artifact = EXPORT_FORMATS[format](model, example_input)
+    _save(path, artifact, format, key)
+
+    return artifact
+
+def _expand_frozen(modules):
+    for module in modules:
+        if not isinstance(module, FrozenSequential):
+            yield module
+            continue
+
+        if module._autocast is not None:
+            raise ValueError(f"can't export a `FrozenSequential` that uses autocast\n• autocast: {module._autocast!r}\n• did you mean to convert the model to the desired data type instead?")
+
+        if module._memory_format is not None:
+            yield _ToMemoryFormat(module._memory_format)
+
+        yield from _expand_frozen(module.children())
+
+class _ToMemoryFormat(nn.Module):
+    # The equivalent of `to_memory_format()`, written so that it can be 
+    # compiled by TorchScript.
+
+    def __init__(self, memory_format: MemoryFormat):
+        super().__init__()
+        self.channels_last = (
+                get_memory_format(memory_format, 4) == torch.channels_last
+        )
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        if not self.channels_last:
+            return x.contiguous()
+        if x.dim() == 4:
+            return x.contiguous(memory_format=torch.channels_last)
+        if x.dim() == 5:
+            return x.contiguous(memory_format=torch.channels_last_3d)
+        return x
+
+def _export(model, example_input):
+    return torch.export.export(model, (example_input,))
+
+def _script(model, example_input):
+    return torch.jit.script(model)
+
+def _load(path, format):
+    extra_files = {_KEY_FILE: ''}
+
+    # Any file that can't be loaded is just treated as out-of-date.
+    try:
+        if format == 'torchscript':
+            artifact = torch.jit.load(path, _extra_files=extra_files)
+        else:
+            artifact = torch.export.load(path, extra_files=extra_files)
+    except Exception:
+        return None, None
+
+    key = extra_files[_KEY_FILE]
+    if isinstance(key, bytes):
+        key = key.decode()
+
+    return artifact, key
+
+def _save(path, artifact, format, key):
+    extra_files = {_KEY_FILE: key}
+
+    if format == 'torchscript':
+        save = lambda f: torch.jit.save(artifact, f, _extra_files=extra_files)
+    else:
+        save = lambda f: torch.export.save(artifact, f, extra_files=extra_files)
+
+    suffix = '.pt' if format == 'torchscript' else '.pt2'
+    _save_atomic(path, save, suffix=suffix)
+
+def _get_state_dict(artifact):
+    if isinstance(artifact, torch.jit.ScriptModule):
+        return artifact.state_dict()
+    else:
+        return artifact.state_dict
+
+def _copy_weights(dest, src):
+    changed = False
+
+    with torch.no_grad():
+        for k, v in src.items():
+            if not torch.equal(dest[k], v):
+                dest[k].copy_(v)
+                changed = True
+
+    return changed
+
+EXPORT_FORMATS = {
+        'torch.export': _export,
+        'torchscript': _script,
+}
+_KEY_FILE = 'torchyield_key'
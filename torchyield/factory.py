@@ -1,5 +1,13 @@
+import torch
 import torch.nn as nn
 
+from .shapes import get_curr_shape
+from .initialize import materialize, check_init
+from .layout import get_memory_format, module_to_memory_format
+from .precision import keep_fp32, AUTOCAST_FP32_FACTORIES
+from functools import cache
+
+@cache
 def make_factory(factory_name):
     """
     Dynamically create layer factories.
@@ -20,6 +28,15 @@ def make_factory(factory_name):
       conv1     nn.Conv1d
       conv2     nn.Conv2d
       conv3     nn.Conv3d
+      dwconv1   nn.Conv1d (depthwise)
+      dwconv2   nn.Conv2d (depthwise)
+      dwconv3   nn.Conv3d (depthwise)
+      pwconv1   nn.Conv1d (pointwise)
+      pwconv2   nn.Conv2d (pointwise)
+      pwconv3   nn.Conv3d (pointwise)
+      sepconv1  nn.Conv1d (depthwise) + nn.Conv1d (pointwise)
+      sepconv2  nn.Conv2d (depthwise) + nn.Conv2d (pointwise)
+      sepconv3  nn.Conv3d (depthwise) + nn.Conv3d (pointwise)
       maxpool   nn.MaxPool*
       avgpool   nn.AvgPool*
       relu      nn.ReLU
@@ -48,60 +65,110 @@ def make_factory(factory_name):
       [3] The `inplace` argument for `nn.ReLU` isn't prefixed, and defaults to 
           True rather than False.
 
+    - Depthwise convolutions (`dwconv`) have `groups=in_channels`, so each 
+      input channel is convolved separately.  The number of output channels 
+      must be a multiple of the number of input channels.  Pointwise 
+      convolutions (`pwconv`) have `kernel_size=1`, so they only mix 
+      channels.  Depthwise-separable convolutions (`sepconv`) are a depthwise 
+      convolution from *in_channels* to *in_channels* (without a bias), 
+      followed by a pointwise convolution from *in_channels* to 
+      *out_channels*.  The spatial arguments (e.g. *kernel_size*, *stride*) 
+      apply to the depthwise convolution.  This is much cheaper than a dense 
+      convolution with the same arguments, so e.g. `conv2_bn_relu_layer` can 
+      be replaced by `sepconv2_bn_relu_layer` without changing anything else.
+
+    - Every factory accepts `device` and `dtype` arguments.  These are passed 
+      on to every module that has parameters or buffers (i.e. linear, 
+      convolutional, and batch norm modules), so that those parameters are 
+      created directly on the given device with the given data type.  For 
+      factories that don't create any such modules, these arguments are 
+      still checked for validity, but otherwise ignored.
+
+    - Every factory also accepts an `init` argument, which controls how the 
+      parameters of each module are initialized.  The default is to 
+      initialize them as usual, but `init='skip'` leaves them uninitialized 
+      (e.g. if a checkpoint will be loaded next) and a scheme name like 
+      `init='kaiming_uniform'` initializes them with a per-module random 
+      number generator.  See `materialize()` for all the options.  Note that 
+      each module is initialized on its own, with a seed drawn from the 
+      global random number generator, so the weights depend on how many 
+      modules were initialized before (as with the default initialization) 
+      and aren't initialized in parallel.  To initialize a whole model in 
+      parallel, pass `init` to `module_from_layers()` or `FrozenSequential` 
+      instead.
+
+    - Every factory also accepts a `memory_format` argument.  If given, the 
+      parameters of every module are converted to that format.  This is 
+      mostly useful for `memory_format='channels_last'` with 2D/3D 
+      convolutions, which can be much faster on CPUs.  Note that the inputs 
+      also have to be in this format to get any benefit; see 
+      `FrozenSequential`.
+
+    - The `in_channels` argument can be 'auto'.  In this case, the number of 
+      input channels is taken from the shape of the input to the layer.  This 
+      is only possible when the layers are built with a known input shape, 
+      e.g. `module_from_layers(..., input_shape=...)`.
+
     Special considerations:
 
     - If a convolutional or linear layer is followed immediately by a batch 
       norm layer, the bias will be disabled by default.  Since the batch norm 
       will re-center the output on 0 anyways, there's no reason to calculate a 
       bias in such cases.
+
+    - Batch norm and sigmoid modules are marked with `keep_fp32()`, so that 
+      they're evaluated in full precision even if the rest of the model uses 
+      autocast.  See `FrozenSequential`.
     """
     if not factory_name.endswith('_layer'):
         raise AttributeError(factory_name)
 
-    module_names = factory_name.split('_')[:-1]
+    # Resolve everything that depends only on the name of the factory (i.e.  
+    # module classes, dimensions, and argument mappings) up front.  That way, 
+    # calling the factory only has to bind the given arguments.  Errors in the 
+    # name are deferred until the factory is actually called, so that they 
+    # are reported in the same way as errors in the arguments.
+    try:
+        steps, known_kwargs = compile_factory(factory_name)
+    except (AttributeError, ValueError) as err:
+        error = err
 
-    def factory(**kwargs):
-        state = {
-                'factory_name': factory_name,
-                'module_names': module_names,
-                'kwargs': kwargs,
-                'used_kwargs': set(),
-        }
+        def factory(**kwargs):
+            raise error.with_traceback(None)
+            yield
 
-        assert set(FACTORY_GETTERS) == set(FACTORY_KWARGS_GETTERS)
+    else:
+        def factory(**kwargs):
+            unused_kwargs = kwargs.keys() - known_kwargs
+            if unused_kwargs:
+                raise TypeError(f"{factory_name}() got unexpected keyword argument(s): {','.join(map(repr, unused_kwargs))}")
 
-        for i, module_name in enumerate(module_names):
-            state['module_name'] = module_name
-            state['i'] = i
+            if kwargs.keys() & {'device', 'dtype', 'init', 'memory_format'}:
+                check_factory_kwargs(factory_name, kwargs)
 
-            try:
-                factory_getter = FACTORY_GETTERS[module_name]
-            except KeyError:
-                from difflib import get_close_matches
-                did_you_mean = get_close_matches(module_name, FACTORY_GETTERS, n=1)
-                suffix = f"\n• did you mean: {did_you_mean[0]!r}" if did_you_mean else ""
-                raise AttributeError(f"{factory_name}() includes unknown module {module_name!r}{suffix}") from None
+            init = kwargs.get('init', 'default')
+            memory_format = kwargs.get('memory_format')
 
-            factory = factory_getter(state)
+            for module_cls, binders, skip, fp32 in steps:
+                if skip and skip(kwargs):
+                    continue
 
-            factory_kwargs = {}
-            for f in FACTORY_KWARGS_GETTERS[module_name]:
-                factory_kwargs |= f(state)
+                factory_kwargs = {}
+                for bind in binders:
+                    factory_kwargs |= bind(kwargs)
 
-            if state.get('skip_module', False):
-                del state['skip_module']
-                continue
+                if init == 'default':
+                    module = module_cls(**factory_kwargs)
+                else:
+                    module = init_module(module_cls, factory_kwargs, init)
 
-            yield factory(**factory_kwargs)
+                if memory_format is not None:
+                    module_to_memory_format(module, memory_format)
 
-            try:
-                state['curr_dimension'] = DIMENSIONS[module_name]
-            except KeyError:
-                pass
+                if fp32:
+                    keep_fp32(module)
 
-        unused_kwargs = set(kwargs) - state['used_kwargs']
-        if unused_kwargs:
-            raise TypeError(f"{factory_name}() got unexpected keyword argument(s): {','.join(map(repr, unused_kwargs))}")
+                yield module
 
     factory.__name__ = factory_name
     factory.__qualname__ = f'torchyield.{factory_name}'
@@ -109,86 +176,253 @@ def make_factory(factory_name):
 
     return factory
 
+def compile_factory(factory_name):
+    """
+    Work out which modules the given factory will create, and how the 
+    arguments to the factory will map onto the arguments to those modules.
+
+    The return value is a tuple of steps (one for each module) and the set of 
+    all keyword arguments that the factory accepts.  Each step is a tuple of 
+    the module class, a list of functions that each map the factory arguments 
+    to some of the module arguments, an optional function that decides 
+    whether or not to skip the module, and whether or not the module should 
+    be kept in full precision when using autocast.
+    """
+    assert set(FACTORY_GETTERS) == set(FACTORY_KWARGS_GETTERS)
+
+    module_names = [
+            x
+            for name in factory_name.split('_')[:-1]
+            for x in FACTORY_EXPANSIONS.get(name, [name])
+    ]
+    state = {
+            'factory_name': factory_name,
+            'module_names': module_names,
+            'used_kwargs': {'device', 'dtype', 'init', 'memory_format'},
+    }
+    steps = []
+
+    for i, module_name in enumerate(module_names):
+        state['module_name'] = module_name
+        state['i'] = i
 
-def get_channels(in_key='in_channels', out_key='out_channels'):
-    def _get_channels(state):
-        if 'channel_module' in state:
-            raise ValueError("{factory_name}() has {module_name!r} after {channel_module!r}\n✖ both of these modules need exclusive access to the `in_channels` and `out_channels` arguments".format_map(state))
+        try:
+            factory_getter = FACTORY_GETTERS[module_name]
+        except KeyError:
+            from difflib import get_close_matches
+            did_you_mean = get_close_matches(module_name, get_factory_tokens(), n=1)
+            suffix = f"\n• did you mean: {did_you_mean[0]!r}" if did_you_mean else ""
+            raise AttributeError(f"{factory_name}() includes unknown module {module_name!r}{suffix}") from None
+
+        module = factory_getter(state)
+        binders = [f(state) for f in FACTORY_KWARGS_GETTERS[module_name]]
+        skip = state.pop('skip_module', None)
+
+        fp32 = module_name in AUTOCAST_FP32_FACTORIES
 
-        kwargs = state['kwargs']
+        steps.append((module, binders, skip, fp32))
 
         try:
-            in_channels = kwargs['in_channels']
-            out_channels = kwargs['out_channels']
-        except KeyError as err:
-            raise TypeError(f"{state['factory_name']}() missing required argument: {err}") from None
+            state['curr_dimension'] = DIMENSIONS[module_name]
+        except KeyError:
+            pass
+
+    return tuple(steps), frozenset(state['used_kwargs'])
 
-        state['curr_channels'] = out_channels
+def get_factory_tokens():
+    """
+    Return the names of every module that can be included in a factory name.
+    """
+    internal = {x for v in FACTORY_EXPANSIONS.values() for x in v}
+    return [
+            *(k for k in FACTORY_GETTERS if k not in internal),
+            *FACTORY_EXPANSIONS,
+    ]
+
+def check_factory_kwargs(factory_name, kwargs):
+    if (device := kwargs.get('device')) is not None:
+        try:
+            torch.device(device)
+        except (RuntimeError, TypeError) as err:
+            raise ValueError(f"{factory_name}() got invalid device: {device!r}\n✖ {err}") from None
+
+    if (dtype := kwargs.get('dtype')) is not None:
+        if not isinstance(dtype, torch.dtype):
+            raise TypeError(f"{factory_name}() got invalid dtype: {dtype!r}\n✖ expected a `torch.dtype`, e.g. `torch.bfloat16`")
+
+    if (memory_format := kwargs.get('memory_format')) is not None:
+        try:
+            get_memory_format(memory_format, 0)
+        except ValueError as err:
+            raise ValueError(f"{factory_name}() got {err}") from None
+
+    if 'init' in kwargs:
+        try:
+            check_init(kwargs['init'])
+        except ValueError as err:
+            raise ValueError(f"{factory_name}() got {err}") from None
+
+def init_module(module_cls, kwargs, init):
+    """
+    Construct a module on the meta device, then materialize it with the given 
+    initialization.
+
+    The module ends up on the device given by the *device* argument, if any, 
+    or else the current default device.  Each call draws its own seed from 
+    the global random number generator, and initializes only this module, 
+    in the calling thread.
+    """
+    kwargs = kwargs.copy()
+    device = kwargs.pop('device', None) or torch.get_default_device()
+
+    with torch.device('meta'):
+        module = module_cls(**kwargs)
+
+    return materialize(module, device, init=init)
+
+
+# Each of the following "kwargs getters" is called once, when the factory is 
+# compiled, with information about where the module appears in the factory.  
+# It must return a function that will be called every time the factory is 
+# called, with the arguments passed to the factory, and that will return the 
+# arguments to pass on to the module.
+
+def get_channels(in_key='in_channels', out_key='out_channels', channel_dim=1):
+    def _get_channels(state):
+        if 'channel_module' in state:
+            module_name = _format_module_name(state['module_name'])
+            channel_module = _format_module_name(state['channel_module'])
+            raise ValueError(f"{state['factory_name']}() has {module_name} after {channel_module}\n✖ both of these modules need exclusive access to the `in_channels` and `out_channels` arguments")
+
+        factory_name = state['factory_name']
+        state['curr_channels'] = 'out_channels'
         state['channel_module'] = state['module_name']
         state['used_kwargs'].update(['in_channels', 'out_channels'])
 
+        def bind(kwargs):
+            try:
+                out_channels = kwargs['out_channels']
+            except KeyError as err:
+                raise TypeError(f"{factory_name}() missing required argument: {err}") from None
+
+            in_channels = _bind_in_channels(factory_name, kwargs, channel_dim)
+
+            return {
+                    in_key: in_channels,
+                    out_key: out_channels,
+            }
+
+        return bind
+
+    return _get_channels
+
+def get_depthwise_channels(state):
+    # The number of groups is always the number of input channels, so the 
+    # `groups` argument isn't accepted.
+    bind_channels = get_channels()(state)
+
+    factory_name = state['factory_name']
+
+    def bind(kwargs):
+        kw = bind_channels(kwargs)
+
+        if kw['out_channels'] % kw['in_channels']:
+            raise ValueError(f"{factory_name}() got out_channels={kw['out_channels']}, which isn't a multiple of in_channels={kw['in_channels']}\n✖ each input channel of a depthwise convolution must produce the same number of output channels")
+
+        kw['groups'] = kw['in_channels']
+        return kw
+
+    return bind
+
+def get_separable_channels(state):
+    # The depthwise half of a separable convolution doesn't change the number 
+    # of channels, so it leaves the `out_channels` argument for the pointwise 
+    # half.
+    factory_name = state['factory_name']
+    state['used_kwargs'].add('in_channels')
+
+    def bind(kwargs):
+        in_channels = _bind_in_channels(factory_name, kwargs, 1)
         return {
-                in_key: in_channels,
-                out_key: out_channels,
+                'in_channels': in_channels,
+                'out_channels': in_channels,
+                'groups': in_channels,
+                'bias': False,
         }
 
-    return _get_channels
+    return bind
+
+def _bind_in_channels(factory_name, kwargs, channel_dim):
+    try:
+        in_channels = kwargs['in_channels']
+    except KeyError as err:
+        raise TypeError(f"{factory_name}() missing required argument: {err}") from None
+
+    if in_channels == 'auto':
+        if (curr_shape := get_curr_shape()) is None:
+            raise ValueError(f"{factory_name}() can't infer `in_channels`\n• the input shape is unknown\n• did you mean to specify `input_shape` when building the model?")
+        in_channels = curr_shape[channel_dim]
+
+    return in_channels
+
+def _format_module_name(module_name):
+    # Report the modules that are expanded from a single name (e.g. 
+    # 'sepconv2:pointwise') by the name that the user actually wrote.
+    name, _, part = module_name.partition(':')
+    return f'{name!r} ({part})' if part else repr(name)
 
 def get_curr_channels(key):
     def _get_curr_channels(state):
         try:
             curr_channels = state['curr_channels']
         except KeyError:
-            raise ValueError("'{module_name}' must come after 'linear' or 'conv'".format_map(state))
+            raise ValueError("'{module_name}' must come after 'linear' or 'conv'".format_map(state)) from None
 
-        return {key: curr_channels}
+        return lambda kwargs: {key: kwargs[curr_channels]}
 
     return _get_curr_channels
         
 def get_bias(state):
     state['used_kwargs'].add('bias')
-    kwargs = state['kwargs']
 
     try:
-        bias = kwargs['bias']
-    except KeyError:
-        try:
-            bias = state['module_names'][state['i'] + 1] != 'bn'
-        except IndexError:
-            bias = True
+        default = state['module_names'][state['i'] + 1] != 'bn'
+    except IndexError:
+        default = True
 
-    return dict(bias=bias)
+    return lambda kwargs: dict(bias=kwargs.get('bias', default))
 
 def get_pool_size(state):
-    kwargs = get_kwargs(pool_size='kernel_size')(state)
-    state['skip_module'] = kwargs and kwargs['kernel_size'] <= 1
-    return kwargs
+    state['skip_module'] = \
+            lambda kwargs: 'pool_size' in kwargs and kwargs['pool_size'] <= 1
+    return get_kwargs(pool_size='kernel_size')(state)
 
 def get_inplace(state):
     state['used_kwargs'].add('inplace')
+    return lambda kwargs: dict(inplace=kwargs.get('inplace', True))
 
-    kwargs = state['kwargs']
-
-    try:
-        inplace = kwargs['inplace']
-    except KeyError:
-        inplace = True
-
-    return dict(inplace=inplace)
+def get_factory_kwargs(state):
+    # The `device` and `dtype` arguments are always accepted, see 
+    # `compile_factory()`.
+    return get_kwargs('device', 'dtype')(state)
 
 def get_kwargs(*kwarg_list, **kwarg_map):
     kwarg_map = {x: x for x in kwarg_list} | kwarg_map
+    kwarg_items = tuple(kwarg_map.items())
 
     def _get_kwargs(state):
         state['used_kwargs'].update(kwarg_map)
-        return {
-                kwarg_map[k]: state['kwargs'][k]
-                for k in state['kwargs']
-                if k in kwarg_map
-        }
+
+        def bind(kwargs):
+            return {v: kwargs[k] for k, v in kwarg_items if k in kwargs}
+
+        return bind
 
     return _get_kwargs
 
+def get_fixed_kwargs(**kwargs):
+    return lambda state: lambda _: kwargs
+
 def get_module(module):
     return lambda _: module
 
@@ -209,6 +443,18 @@ FACTORY_GETTERS = {
         'conv1': get_module(nn.Conv1d),
         'conv2': get_module(nn.Conv2d),
         'conv3': get_module(nn.Conv3d),
+        'dwconv1': get_module(nn.Conv1d),
+        'dwconv2': get_module(nn.Conv2d),
+        'dwconv3': get_module(nn.Conv3d),
+        'pwconv1': get_module(nn.Conv1d),
+        'pwconv2': get_module(nn.Conv2d),
+        'pwconv3': get_module(nn.Conv3d),
+        'sepconv1:depthwise': get_module(nn.Conv1d),
+        'sepconv2:depthwise': get_module(nn.Conv2d),
+        'sepconv3:depthwise': get_module(nn.Conv3d),
+        'sepconv1:pointwise': get_module(nn.Conv1d),
+        'sepconv2:pointwise': get_module(nn.Conv2d),
+        'sepconv3:pointwise': get_module(nn.Conv3d),
         'maxpool': get_module_by_dim({
             1: nn.MaxPool1d,
             2: nn.MaxPool2d,
@@ -235,12 +481,14 @@ FACTORY_GETTERS = {
 }
 FACTORY_KWARGS_GETTERS = {
         'linear': [
-            get_channels('in_features', 'out_features'),
+            get_channels('in_features', 'out_features', channel_dim=-1),
             get_bias,
+            get_factory_kwargs,
         ],
         'conv1': (_conv := [
             get_channels(),
             get_bias,
+            get_factory_kwargs,
             get_kwargs(
                 'kernel_size',
                 'stride',
@@ -252,6 +500,44 @@ FACTORY_KWARGS_GETTERS = {
         ]),
         'conv2': _conv,
         'conv3': _conv,
+        'dwconv1': (_dwconv := [
+            get_depthwise_channels,
+            get_bias,
+            get_factory_kwargs,
+            get_kwargs(
+                'kernel_size',
+                'stride',
+                'padding',
+                'dilation',
+                'padding_mode',
+            ),
+        ]),
+        'dwconv2': _dwconv,
+        'dwconv3': _dwconv,
+        'pwconv1': (_pwconv := [
+            get_channels(),
+            get_bias,
+            get_factory_kwargs,
+            get_fixed_kwargs(kernel_size=1),
+        ]),
+        'pwconv2': _pwconv,
+        'pwconv3': _pwconv,
+        'sepconv1:depthwise': (_sepconv_depthwise := [
+            get_separable_channels,
+            get_factory_kwargs,
+            get_kwargs(
+                'kernel_size',
+                'stride',
+                'padding',
+                'dilation',
+                'padding_mode',
+            ),
+        ]),
+        'sepconv2:depthwise': _sepconv_depthwise,
+        'sepconv3:depthwise': _sepconv_depthwise,
+        'sepconv1:pointwise': _pwconv,
+        'sepconv2:pointwise': _pwconv,
+        'sepconv3:pointwise': _pwconv,
         'maxpool': [
             get_pool_size,
             get_kwargs(
@@ -298,6 +584,7 @@ FACTORY_KWARGS_GETTERS = {
         'tanh': [],
         'bn': [
             get_curr_channels('num_features'),
+            get_factory_kwargs,
             get_kwargs(
                 bn_eps='eps',
                 bn_momentum='momentum',
@@ -316,5 +603,26 @@ DIMENSIONS = {
         'conv1': 1,
         'conv2': 2,
         'conv3': 3,
+        'dwconv1': 1,
+        'dwconv2': 2,
+        'dwconv3': 3,
+        'pwconv1': 1,
+        'pwconv2': 2,
+        'pwconv3': 3,
+        'sepconv1:depthwise': 1,
+        'sepconv2:depthwise': 2,
+        'sepconv3:depthwise': 3,
+        'sepconv1:pointwise': 1,
+        'sepconv2:pointwise': 2,
+        'sepconv3:pointwise': 3,
+}
+
+# Some names stand for more than one module.  Each is replaced by the names 
+# of the modules it stands for before the factory is compiled.  These 
+# internal names can't be used directly, because they contain a colon.
+FACTORY_EXPANSIONS = {
+        'sepconv1': ['sepconv1:depthwise', 'sepconv1:pointwise'],
+        'sepconv2': ['sepconv2:depthwise', 'sepconv2:pointwise'],
+        'sepconv3': ['sepconv3:depthwise', 'sepconv3:pointwise'],
 }
 
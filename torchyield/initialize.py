@@ -0,0 +1,202 @@
+import torch
+import torch.nn as nn
+import math
+
+from concurrent.futures import ThreadPoolExecutor
+from collections.abc import Callable
+from typing import TypeAlias
+
+__all__ = [
+        'Init',
+        'materialize',
+        'init_parameters',
+        'check_init',
+        'INIT_SCHEMES',
+]
+
+Init: TypeAlias = str | Callable[[nn.Module], None]
+
+def materialize(
+        module: nn.Module,
+        device: torch.device | str = 'cpu',
+        dtype: torch.dtype | None = None,
+        init: Init = 'default',
+        *,
+        seed: int | None = None,
+        num_threads: int | None = None,
+) -> nn.Module:
+    """
+    Allocate storage for the parameters and buffers of a module that was 
+    constructed on the meta device.
+
+    Arguments:
+        module:
+            The module to materialize, e.g. the result of calling 
+            `module_from_layers(..., device='meta')`.  Note that every 
+            parameter and buffer will be replaced, even those that were 
+            not on the meta device to begin with.
+
+        device:
+            The device to allocate storage on.
+
+        dtype:
+            The data type to use for all floating point parameters and 
+            buffers.  This conversion happens before any storage is 
+            allocated, so it doesn't require any extra copies.
+
+        init:
+            How to initialize the newly allocated parameters:
+
+            - ``'default'``: Call the ``reset_parameters()`` method of 
+              every submodule that has one.  This reproduces the 
+              initialization that would've happened if the module had been 
+              constructed on a real device.
+
+            - ``'skip'``: Leave the parameters uninitialized.  This is 
+              only appropriate if the parameters will be immediately 
+              overwritten, e.g. by loading a checkpoint.
+
+            - The name of an initialization scheme, e.g. 
+              ``'kaiming_uniform'``: Initialize the weights of every 
+              linear/convolutional submodule in parallel.  See 
+              `init_parameters()` for details.
+
+            - A callable: Call it once on every submodule, in the same 
+              manner as `torch.nn.Module.apply`.
+
+        seed:
+        num_threads:
+            See `init_parameters()`.  These arguments only affect named 
+            initialization schemes.
+
+    Returns:
+        The given module, which is modified in place.
+    """
+    if dtype is not None:
+        module.to(dtype=dtype)
+
+    module.to_empty(device=device)
+    init_parameters(module, init, seed=seed, num_threads=num_threads)
+
+    return module
+
+def init_parameters(
+        module: nn.Module,
+        init: Init = 'default',
+        *,
+        seed: int | None = None,
+        num_threads: int | None = None,
+) -> None:
+    """
+    Initialize the parameters of the given module in place.
+
+    See `materialize()` for a description of the possible values for *init*.  
+    The named initialization schemes are:
+
+    - ``'kaiming_uniform'``: The same distributions that PyTorch uses by 
+      default for linear and convolutional modules.
+    - ``'kaiming_normal'``: He initialization for ReLU networks, with zero 
+      biases.
+    - ``'xavier_uniform'``, ``'xavier_normal'``: Glorot initialization, with 
+      zero biases.
+
+    These schemes apply to every submodule that has a ``weight`` parameter 
+    with at least two dimensions.  Every such submodule gets its own random 
+    number generator, seeded by *seed* plus its position in 
+    ``module.modules()``, so the submodules can be initialized on a pool of 
+    *num_threads* threads and the result will be the same regardless of how 
+    many threads are used.  If *seed* isn't given, it's drawn from the global 
+    random number generator, so that `torch.manual_seed()` still makes the 
+    initialization reproducible.  All other submodules with a 
+    ``reset_parameters()`` method (e.g. batch normalization) are reset 
+    normally, in the calling thread.
+    """
+    if init == 'default':
+        for submodule in module.modules():
+            if hasattr(submodule, 'reset_parameters'):
+                submodule.reset_parameters()
+
+    elif init == 'skip':
+        pass
+
+    elif isinstance(init, str) and init in INIT_SCHEMES:
+        _init_parallel(module, INIT_SCHEMES[init], seed, num_threads)
+
+    elif callable(init):
+        module.apply(init)
+
+    else:
+        check_init(init)
+
+def check_init(init: Init) -> None:
+    if init in ('default', 'skip') or init in INIT_SCHEMES or callable(init):
+        return
+
+    schemes = ', '.join(map(repr, ['default', 'skip', *INIT_SCHEMES]))
+    raise ValueError(f"unknown initialization: {init!r}\n• expected one of: {schemes}, or a callable")
+
+def _init_parallel(module, init_weights, seed, num_threads):
+    if seed is None:
+        seed = int(torch.randint(2**62, ()))
+
+    jobs = []
+
+    for i, submodule in enumerate(module.modules()):
+        weight = getattr(submodule, 'weight', None)
+
+        if isinstance(weight, nn.Parameter) and weight.dim() >= 2:
+            generator = torch.Generator(weight.device)
+            generator.manual_seed(seed + i)
+            jobs.append((submodule, generator))
+
+        elif hasattr(submodule, 'reset_parameters'):
+            submodule.reset_parameters()
+
+    # Don't bother starting any threads for a single module, e.g. when each 
+    # module is initialized by its own factory.
+    if len(jobs) <= 1 or num_threads == 1:
+        for submodule, generator in jobs:
+            init_weights(submodule, generator)
+        return
+
+    # The initialization functions spend most of their time in kernels that 
+    # release the GIL, so threads are enough to get real parallelism.
+    with ThreadPoolExecutor(num_threads) as executor:
+        futures = [
+                executor.submit(init_weights, submodule, generator)
+                for submodule, generator in jobs
+        ]
+        for future in futures:
+            future.result()
+
+@torch.no_grad()
+def _init_kaiming_uniform(module, generator):
+    # This mirrors `nn.Linear.reset_parameters()` and 
+    # `nn.Conv*.reset_parameters()`.
+    nn.init.kaiming_uniform_(module.weight, a=math.sqrt(5), generator=generator)
+
+    if getattr(module, 'bias', None) is not None:
+        fan_in, _ = nn.init._calculate_fan_in_and_fan_out(module.weight)
+        bound = 1 / math.sqrt(fan_in) if fan_in > 0 else 0
+        nn.init.uniform_(module.bias, -bound, bound, generator=generator)
+
+def _init_with_zero_bias(init_weight, **kwargs):
+
+    @torch.no_grad()
+    def _init(module, generator):
+        init_weight(module.weight, generator=generator, **kwargs)
+
+        if getattr(module, 'bias', None) is not None:
+            nn.init.zeros_(module.bias)
+
+    return _init
+
+INIT_SCHEMES = {
+        'kaiming_uniform': _init_kaiming_uniform,
+        'kaiming_normal': _init_with_zero_bias(
+            nn.init.kaiming_normal_,
+            nonlinearity='relu',
+        ),
+        'xavier_uniform': _init_with_zero_bias(nn.init.xavier_uniform_),
+        'xavier_normal': _init_with_zero_bias(nn.init.xavier_normal_),
+}
@@ -1,13 +1,39 @@
+import torch
 import torch.nn as nn
 
-from more_itertools import zip_broadcast, pairwise, unzip
-from itertools import cycle
+from .params import broadcast_params, channels
+from .spec import Spec, _MLP_OUTPUT_KWARGS
+from .initialize import Init, materialize, check_init
+from .layout import MemoryFormat, to_memory_format, module_to_memory_format
+from .precision import Fp32Module, keep_fp32, is_fp32
+from more_itertools import pairwise
+from torch.utils.checkpoint import checkpoint
+from functools import partial
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
 
-from collections.abc import Iterable, Callable
-from typing import TypeAlias
+from collections.abc import Iterable, Callable, Sequence
+from typing import Any, TypeAlias
+
+__all__ = [
+        'Layer',
+        'LayerFactory',
+        'Device',
+        'Pass',
+        'FrozenSequential',
+        'module_from_layer',
+        'module_from_layers',
+        'modules_from_layer',
+        'modules_from_layers',
+        'make_layers',
+        'mlp_layer',
+        'channels',
+]
 
 Layer: TypeAlias = Iterable[nn.Module] | nn.Module
 LayerFactory: TypeAlias = Callable[..., Layer]
+Device: TypeAlias = torch.device | str | None
+Pass: TypeAlias = Callable[..., Iterable[nn.Module]]
 
 class FrozenSequential(nn.Module):
     """
@@ -17,36 +43,244 @@ class FrozenSequential(nn.Module):
     from this class a bit more convenient.  Since no API for modifying 
     the layers is exposed, subclasses do not have their namespaces polluted 
     with potentially dangerous methods.
+
+    If *device* is given, the layers are constructed on that device.  In 
+    particular, specifying `device='meta'` creates all of the parameters 
+    without allocating any storage for them or initializing them.  Such 
+    modules can later be made usable either with `materialize()`, or by 
+    loading a checkpoint with `load_state_dict(..., assign=True)`.
+
+    If *input_shape* is given, the layers are constructed one at a time, and 
+    the shape of the input to each is calculated before it is constructed.  
+    This allows factories to use `in_channels='auto'`.  See `infer_shapes()` 
+    for details.
+
+    If *init* is given, the layers are constructed on the meta device and 
+    then materialized using the given initialization.  In particular, 
+    `init='skip'` avoids spending any time initializing parameters that will 
+    just be overwritten by a checkpoint, and named schemes like 
+    `init='kaiming_uniform'` initialize the layers in parallel.  Note that 
+    this replaces the parameters of any pre-built modules that are passed in 
+    as layers.  See `materialize()` for details.
+
+    If *cache_dir* is given, the initial parameters are stored in that 
+    directory, keyed by the structure of the layers and the given *seed*.  
+    The next time the same layers are constructed with the same seed, the 
+    parameters are memory-mapped from the cache instead of being 
+    initialized.  See `load_cached_modules()` for details.
+
+    If *passes* is given, the layers are simplified by applying each of the 
+    given passes, e.g. `DEFAULT_PASSES`.  See `optimize()` for details.
+
+    If *fuse* is true, batch normalization modules are folded into the 
+    preceding linear/convolutional modules.  See `fuse()` for details.
+
+    If *checkpoint_segments* is given, the layers are divided into that many 
+    contiguous segments, and activation checkpointing is applied to each 
+    segment.  This means that only the inputs to each segment are kept in 
+    memory for the backward pass; everything else is recomputed.  The 
+    segment boundaries are chosen such that no segment begins with an 
+    in-place module (e.g. `nn.ReLU(inplace=True)`), since such a module 
+    would overwrite the input needed to recompute the segment.  Buffers 
+    (e.g. batch normalization statistics) are not updated a second time 
+    during recomputation.
+
+    If *memory_format* is given, the parameters of every layer are converted 
+    to that format, and so is the input to the first layer.  Most modules 
+    produce outputs in the same format as their inputs, so all of the 
+    activations will stay in this format.  This is mostly useful for 
+    `memory_format='channels_last'` with 2D/3D convolutions, which can be 
+    much faster on CPUs.  Use `find_layout_conversions()` to find any layers 
+    (e.g. `nn.Flatten`) that have to convert their input back to the default 
+    format.
+
+    If *autocast* is given, the forward pass is evaluated under 
+    `torch.autocast` with that data type, e.g. `torch.bfloat16`.  Modules 
+    marked with `keep_fp32()` are still evaluated in full precision, with 
+    their inputs converted to float32 first.  The factories mark batch norm 
+    and sigmoid modules in this way, and `mlp_layer()` marks its final linear 
+    layer.  The parameters themselves are not converted, so the state dict is 
+    the same either way.
+
+    If *compile* is true, the forward pass is compiled in place using 
+    `torch.compile`.  Since the layers are fixed, the loop over them can be 
+    fully unrolled, so this doesn't cause any graph breaks (unless the layers 
+    themselves do).
     """
 
-    def __init__(self, *layers: Layer):
+    def __init__(
+            self,
+            *layers: Layer,
+            device: Device = None,
+            input_shape: tuple[int, ...] | None = None,
+            init: Init = 'default',
+            cache_dir: str | Path | None = None,
+            seed: int = 0,
+            passes: Sequence[Pass] | None = None,
+            fuse: bool = False,
+            checkpoint_segments: int | None = None,
+            memory_format: MemoryFormat | None = None,
+            autocast: torch.dtype | None = None,
+            compile: bool = False,
+    ):
         super().__init__()
-        for i, child in enumerate(modules_from_layers(*layers)):
+
+        modules = _build_modules(
+                layers, device, input_shape, init, cache_dir, seed)
+
+        if passes is not None:
+            from .passes import optimize
+            modules = list(optimize(modules, passes=passes))
+
+        if fuse:
+            from .passes import fuse as _fuse
+            modules = list(_fuse(modules))
+
+        if memory_format is not None:
+            for module in modules:
+                module_to_memory_format(module, memory_format)
+
+        for i, child in enumerate(modules):
             self.add_module(str(i), child)
 
+        # The layers can't change, so there's no need to query them from 
+        # `self.children()` on every forward pass.
+        self._layers = tuple(self.children())
+
+        if autocast is not None:
+            self._layers = tuple(
+                    Fp32Module(x) if is_fp32(x) else x
+                    for x in self._layers
+            )
+
+        self._segments = (
+                _split_segments(self._layers, checkpoint_segments)
+                if checkpoint_segments is not None else None
+        )
+        self._memory_format = memory_format
+        self._autocast = autocast
+
+        if compile:
+            self.compile()
+
     def forward(self, x, *args, **kwargs):
-        for module in self.children():
-            x = module(x, *args, **kwargs)
-        return x
+        if self._memory_format is not None:
+            x = to_memory_format(x, self._memory_format)
 
-def module_from_layer(layer: Layer, verbose: bool = False) -> nn.Module:
-    return module_from_layers(layer, verbose=verbose)
+        if self._autocast is not None:
+            with torch.autocast(x.device.type, dtype=self._autocast):
+                return self._forward(x, args, kwargs)
 
-def module_from_layers(*layers: Layer, verbose: bool = False) -> nn.Module:
-    layers = modules_from_layers(*layers)
+        return self._forward(x, args, kwargs)
 
-    if verbose:
-        from .verbose import verbose as _verbose
-        layers = _verbose(layers)
+    def _forward(self, x, args, kwargs):
+        if self._segments and torch.is_grad_enabled():
+            for segment in self._segments:
+                x = checkpoint(
+                        _forward_layers, segment, x, args, kwargs,
+                        use_reentrant=False,
+                        context_fn=partial(_checkpoint_contexts, segment),
+                )
+            return x
+
+        return _forward_layers(self._layers, x, args, kwargs)
+
+def module_from_layer(layer: Layer, **kwargs) -> nn.Module:
+    return module_from_layers(layer, **kwargs)
+
+def module_from_layers(
+        *layers: Layer,
+        verbose: bool | dict[str, Any] = False,
+        device: Device = None,
+        input_shape: tuple[int, ...] | None = None,
+        init: Init = 'default',
+        cache_dir: str | Path | None = None,
+        seed: int = 0,
+        passes: Sequence[Pass] | None = None,
+        fuse: bool = False,
+        checkpoint_segments: int | None = None,
+        memory_format: MemoryFormat | None = None,
+        autocast: torch.dtype | None = None,
+        quantize: str | None = None,
+        calibration_data: torch.Tensor | Iterable[torch.Tensor] | None = None,
+        profile: bool = False,
+) -> nn.Module:
+    # See `FrozenSequential` for a description of the *device*, *input_shape*, 
+    # *init*, *cache_dir*, *seed*, *passes*, *fuse*, *checkpoint_segments*, 
+    # *memory_format*, and *autocast* arguments.
+    #
+    # If *quantize* is given, the layers are converted to an int8 CPU model 
+    # using either 'dynamic' or 'static' quantization.  Static quantization 
+    # requires *calibration_data*.  If *calibration_data* is given, the 
+    # returned module will also have a `quantization_report` attribute that 
+    # compares the accuracy and latency of the quantized model to that of the 
+    # float model.  See `quantize_modules()` for details.
+    #
+    # If *verbose* is true, each layer will print itself and the shape of its 
+    # input whenever it's called.  The returned module will have a 
+    # `verbose_hooks` attribute that can be used to stop this.  If *verbose* 
+    # is a dictionary, it is passed to `VerboseHooks` as keyword arguments, 
+    # e.g. ``verbose=dict(first=1)`` to only print the first forward pass.  
+    # See `VerboseHooks` for details.
+    #
+    # If *profile* is true, each layer is instrumented to record how long it 
+    # takes to evaluate.  The returned module will have a `profiler` 
+    # attribute that can be used to access these statistics.  See 
+    # `LayerProfiler` for details.
+    layers = _build_modules(layers, device, input_shape, init, cache_dir, seed)
+
+    if passes is not None:
+        from .passes import optimize
+        layers = optimize(layers, passes=passes)
+
+    if fuse:
+        from .passes import fuse as _fuse
+        layers = _fuse(layers)
 
     layers = list(layers)
 
-    if len(layers) == 0:
-        return nn.Identity()
+    # Checkpointing, converting the input, and autocasting require control 
+    # over the forward pass, so those are the cases where we can't just return 
+    # a plain `nn.Sequential`.
+    frozen_kwargs = dict(
+            checkpoint_segments=checkpoint_segments,
+            memory_format=memory_format,
+            autocast=autocast,
+    )
+    if quantize is not None:
+        if any(v is not None for v in frozen_kwargs.values()):
+            raise ValueError(f"can't quantize a model that uses any of: {', '.join(frozen_kwargs)}")
+
+        from .quantization import quantize_modules, compare_quantized
+        module = quantize_modules(layers, quantize, calibration_data)
+
+        if calibration_data is not None:
+            module.quantization_report = compare_quantized(
+                    nn.Sequential(*layers),
+                    module,
+                    calibration_data,
+            )
+
+        layers = list(module.children())
+    elif any(v is not None for v in frozen_kwargs.values()):
+        module = FrozenSequential(layers, **frozen_kwargs)
+    elif len(layers) == 0:
+        module = nn.Identity()
     elif len(layers) == 1:
-        return layers[0]
+        module = layers[0]
     else:
-        return nn.Sequential(*layers)
+        module = nn.Sequential(*layers)
+
+    if verbose:
+        from .verbose import VerboseHooks
+        verbose_kwargs = verbose if isinstance(verbose, dict) else {}
+        module.verbose_hooks = VerboseHooks(layers, **verbose_kwargs)
+
+    if profile:
+        from .profiling import LayerProfiler
+        module.profiler = LayerProfiler(layers)
+
+    return module
 
 def modules_from_layer(layer: Layer) -> Iterable[nn.Module]:
     yield from modules_from_layers(layer)
@@ -59,34 +293,161 @@ def modules_from_layers(*layers: Layer) -> Iterable[nn.Module]:
             yield from layer
 
 
-def make_layers(layer_factory: LayerFactory, **params) -> Iterable[Layer]:
-    # Normally we want to be strict, but `itertools.cycle()` is useful enough 
-    # to merit an exception.
-    strict = not any(isinstance(x, cycle) for x in params.values())
+def _build_modules(
+        layers: tuple[Layer, ...],
+        device: Device,
+        input_shape: tuple[int, ...] | None,
+        init: Init = 'default',
+        cache_dir: str | Path | None = None,
+        seed: int = 0,
+) -> list[nn.Module]:
+    if cache_dir is not None:
+        from .cache import load_cached_modules
+        modules = load_cached_modules(
+                lambda: _build_modules(layers, None, input_shape),
+                cache_dir,
+                seed,
+                init,
+        )
+        if device is not None:
+            modules = [m.to(device) for m in modules]
+        return modules
+
+    if init != 'default':
+        check_init(init)
+        modules = _build_modules(layers, 'meta', input_shape)
+        materialize(
+                nn.ModuleList(modules),
+                device or torch.get_default_device(),
+                init=init,
+        )
+        return modules
+
+    # The layers are constructed lazily, so they have to be consumed within 
+    # the device context.
+    with _device_context(device):
+        if input_shape is None:
+            return list(modules_from_layers(*layers))
+        else:
+            from .shapes import infer_shapes
+            modules = modules_from_layers(*layers)
+            return [m for m, _ in infer_shapes(modules, input_shape)]
+
+def _device_context(device: Device):
+    return nullcontext() if device is None else torch.device(device)
+
+def _forward_layers(layers, x, args, kwargs):
+    # Avoid repacking the arguments for every layer in the common case where 
+    # there are no extra arguments.
+    if args or kwargs:
+        for module in layers:
+            x = module(x, *args, **kwargs)
+    else:
+        for module in layers:
+            x = module(x)
+
+    return x
+
+def _split_segments(layers, n):
+    if n < 1:
+        raise ValueError(f"expected at least one checkpoint segment, not {n}")
+
+    boundaries = [0]
 
-    for values in zip_broadcast(*params.values(), strict=strict):
-        kwargs = dict(zip(params.keys(), values))
+    for i in range(1, n):
+        j = max(round(i * len(layers) / n), boundaries[-1])
+
+        # Don't start a segment with an in-place module.  The input to each 
+        # segment is saved for the recomputation, so it can't be modified.
+        while j < len(layers) and getattr(layers[j], 'inplace', False):
+            j += 1
+
+        boundaries.append(j)
+
+    boundaries.append(len(layers))
+
+    return tuple(
+            layers[i:j]
+            for i, j in pairwise(boundaries)
+            if i < j
+    )
+
+def _checkpoint_contexts(layers):
+    return nullcontext(), _restore_buffers(layers)
+
+@contextmanager
+def _restore_buffers(layers):
+    buffers = [b for m in layers for b in m.buffers()]
+    saved = [b.clone() for b in buffers]
+
+    try:
+        yield
+    finally:
+        with torch.no_grad():
+            for buffer, value in zip(buffers, saved):
+                buffer.copy_(value)
+
+
+def make_layers(
+        layer_factory: LayerFactory,
+        *,
+        device: Device = None,
+        dtype: torch.dtype | None = None,
+        memory_format: MemoryFormat | None = None,
+        **params,
+) -> Iterable[Layer]:
+    # The *device*, *dtype*, and *memory_format* arguments are only passed on 
+    # to the factory if they're specified, so that factories that don't 
+    # accept them can still be used.
+    if device is not None:
+        params['device'] = device
+    if dtype is not None:
+        params['dtype'] = dtype
+    if memory_format is not None:
+        params['memory_format'] = memory_format
+
+    for kwargs in broadcast_params(params):
         layer = layer_factory(**kwargs)
 
-        if isinstance(layer, nn.Module):
+        # Specs are yielded as-is, so that `make_layers()` can be used to 
+        # build specs with the factories from `torchyield.spec`.
+        if isinstance(layer, (nn.Module, Spec)):
             yield layer
         else:
             yield from layer
 
-def channels(
-        channels: Iterable[int],
-        keys: tuple[str, str] = ('in_channels', 'out_channels'),
-) -> dict[str, list[int]]:
-    values = map(list, unzip(pairwise(channels)))
-    return dict(zip(keys, values))
-
 
-def mlp_layer(layer_factory, in_channels, out_channels, **kwargs):
+def mlp_layer(
+        layer_factory,
+        in_channels,
+        out_channels,
+        *,
+        device=None,
+        dtype=None,
+        **kwargs,
+):
     yield from make_layers(
             layer_factory,
             in_channels=in_channels[:-1],
             out_channels=out_channels[:-1],
+            device=device,
+            dtype=dtype,
             **kwargs,
     )
-    yield nn.Linear(in_channels[-1], out_channels[-1], bias=True)
+
+    # Use the factory rather than `nn.Linear` directly, so that 
+    # `in_channels='auto'` is supported.  The output layer is kept in full 
+    # precision, because any rounding errors there go straight into the loss.  
+    # Unlike the other arguments, *init* and *memory_format* apply to every 
+    # module, so the output layer needs them too.
+    from .factory import make_factory
+    for module in make_factory('linear_layer')(
+            in_channels=in_channels[-1],
+            out_channels=out_channels[-1],
+            bias=True,
+            device=device,
+            dtype=dtype,
+            **{k: kwargs[k] for k in _MLP_OUTPUT_KWARGS if k in kwargs},
+    ):
+        yield keep_fp32(module)
 
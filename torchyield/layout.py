@@ -0,0 +1,160 @@
+import torch
+import torch.nn as nn
+
+from .module_types import CONV_MODULES, BATCH_NORM_MODULES, POOL_MODULES
+from collections.abc import Iterable
+from typing import TypeAlias
+
+__all__ = [
+        'MemoryFormat',
+        'get_memory_format',
+        'to_memory_format',
+        'module_to_memory_format',
+        'is_memory_format',
+        'find_layout_conversions',
+        'LAYOUT_PRESERVING_MODULES',
+        'LAYOUT_COPYING_MODULES',
+]
+
+MemoryFormat: TypeAlias = str | torch.memory_format
+
+def get_memory_format(
+        memory_format: MemoryFormat,
+        ndim: int,
+) -> torch.memory_format | None:
+    """
+    Resolve the given memory format for a tensor with the given number of 
+    dimensions.
+
+    The name ``'channels_last'`` means `torch.channels_last` for 4D tensors 
+    (e.g. the inputs and weights of 2D convolutions) and 
+    `torch.channels_last_3d` for 5D tensors.  The name ``'contiguous'`` means 
+    `torch.contiguous_format` for any tensor.  `None` is returned if the 
+    memory format doesn't apply to tensors with the given number of 
+    dimensions, in which case such tensors should be left as they are.
+    """
+    if memory_format in ('channels_last', torch.channels_last, torch.channels_last_3d):
+        return {
+                4: torch.channels_last,
+                5: torch.channels_last_3d,
+        }.get(ndim)
+
+    if memory_format in ('contiguous', torch.contiguous_format):
+        return torch.contiguous_format
+
+    raise ValueError(f"unknown memory format: {memory_format!r}\n• expected: 'channels_last', 'contiguous', or a `torch.memory_format`")
+
+def to_memory_format(
+        x: torch.Tensor,
+        memory_format: MemoryFormat,
+) -> torch.Tensor:
+    """
+    Return a tensor with the same data as *x*, but in the given memory 
+    format.  No copy is made if *x* is already in that format, or if the 
+    format doesn't apply to tensors with as many dimensions as *x*.
+    """
+    if (format := get_memory_format(memory_format, x.dim())) is None:
+        return x
+
+    return x.contiguous(memory_format=format)
+
+def module_to_memory_format(
+        module: nn.Module,
+        memory_format: MemoryFormat,
+) -> nn.Module:
+    """
+    Convert every parameter and buffer of the given module to the given 
+    memory format, in place.
+
+    Unlike ``module.to(memory_format=...)``, this handles 4D and 5D tensors 
+    in the same module (e.g. `nn.Conv2d` and `nn.Conv3d`), since 
+    ``'channels_last'`` is resolved separately for each tensor.
+    """
+    # Check that the memory format is valid before changing anything.
+    get_memory_format(memory_format, 0)
+    return module._apply(lambda x: to_memory_format(x, memory_format))
+
+def is_memory_format(
+        x: torch.Tensor,
+        memory_format: MemoryFormat,
+) -> bool:
+    """
+    Return true if the given tensor is stored in the given memory format.
+    """
+    if (format := get_memory_format(memory_format, x.dim())) is None:
+        return False
+
+    return x.is_contiguous(memory_format=format)
+
+def find_layout_conversions(
+        modules: Iterable[nn.Module],
+        input_shape: tuple[int, ...],
+        memory_format: MemoryFormat = 'channels_last',
+) -> list[tuple[int, nn.Module]]:
+    """
+    Find the modules that don't preserve the given memory format.
+
+    Arguments:
+        modules:
+            The modules to check, e.g. the children of a `FrozenSequential` 
+            constructed with *memory_format*.
+
+        input_shape:
+            The shape of the input to the first module, including the batch 
+            dimension.
+
+        memory_format:
+            The memory format that the input will be converted to.
+
+    Returns:
+        The index and module of every module that receives an input in the 
+        given memory format, but produces an output that isn't.  Every such 
+        module either has to copy its input into a different layout (e.g. 
+        `nn.Flatten`) or produces an output that the next module will have to 
+        convert back.  These are the places where the benefit of using a 
+        non-default memory format is lost.
+
+    Whether or not each module preserves the memory format is decided by 
+    explicit rules: `LAYOUT_PRESERVING_MODULES` (e.g. convolution, pooling, 
+    and batch normalization) keep the format of their input, and 
+    `LAYOUT_COPYING_MODULES` (e.g. `nn.Flatten`) always copy their input 
+    into the default format.  The meta kernels don't reliably reproduce the 
+    strides of the real kernels for these modules.  For any other module, 
+    the strides of the output of the meta kernel are used.  Either way, the 
+    modules are evaluated on the meta device, so no memory is allocated for 
+    any activations.
+    """
+    from .shapes import meta_forward
+
+    x = torch.empty(input_shape, device='meta')
+    x = to_memory_format(x, memory_format)
+    conversions = []
+
+    for i, module in enumerate(modules):
+        y = meta_forward(module, x)
+
+        if isinstance(module, LAYOUT_PRESERVING_MODULES) and \
+                is_memory_format(x, memory_format):
+            y = to_memory_format(y, memory_format)
+
+        if isinstance(module, LAYOUT_COPYING_MODULES):
+            y = y.contiguous()
+
+        # Tensors where the format doesn't matter (e.g. with only one 
+        # channel) are both contiguous and channels-last at the same time. 
+        # Such tensors can be reshaped without copying.
+        if is_memory_format(x, memory_format) and \
+                not x.is_contiguous() and \
+                not is_memory_format(y, memory_format):
+            conversions.append((i, module))
+
+        x = y
+
+    return conversions
+
+# These modules produce outputs in the same memory format as their inputs.
+LAYOUT_PRESERVING_MODULES = *CONV_MODULES, *POOL_MODULES, *BATCH_NORM_MODULES
+
+# These modules reshape their inputs, which requires a copy into the default 
+# memory format unless the input is already in that format.
+LAYOUT_COPYING_MODULES = nn.Flatten, nn.Unflatten
@@ -0,0 +1,33 @@
+import torch.nn as nn
+
+__all__ = [
+        'CONV_MODULES',
+        'BATCH_NORM_MODULES',
+        'POOL_MODULES',
+        'DROPOUT_MODULES',
+]
+
+CONV_MODULES = nn.Conv1d, nn.Conv2d, nn.Conv3d
+BATCH_NORM_MODULES = nn.BatchNorm1d, nn.BatchNorm2d, nn.BatchNorm3d
+POOL_MODULES = (
+        nn.MaxPool1d,
+        nn.MaxPool2d,
+        nn.MaxPool3d,
+        nn.AvgPool1d,
+        nn.AvgPool2d,
+        nn.AvgPool3d,
+        nn.AdaptiveMaxPool1d,
+        nn.AdaptiveMaxPool2d,
+        nn.AdaptiveMaxPool3d,
+        nn.AdaptiveAvgPool1d,
+        nn.AdaptiveAvgPool2d,
+        nn.AdaptiveAvgPool3d,
+)
+DROPOUT_MODULES = (
+        nn.Dropout,
+        nn.Dropout1d,
+        nn.Dropout2d,
+        nn.Dropout3d,
+        nn.AlphaDropout,
+        nn.FeatureAlphaDropout,
+)
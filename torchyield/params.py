@@ -0,0 +1,22 @@
+from more_itertools import zip_broadcast, pairwise, unzip
+from itertools import cycle
+
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+# This module must not import torch, because it's used by `torchyield.spec`.
+
+def broadcast_params(params: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    # Normally we want to be strict, but `itertools.cycle()` is useful enough 
+    # to merit an exception.
+    strict = not any(isinstance(x, cycle) for x in params.values())
+
+    for values in zip_broadcast(*params.values(), strict=strict):
+        yield dict(zip(params.keys(), values))
+
+def channels(
+        channels: Iterable[int],
+        keys: tuple[str, str] = ('in_channels', 'out_channels'),
+) -> dict[str, list[int]]:
+    values = map(list, unzip(pairwise(channels)))
+    return dict(zip(keys, values))
@@ -0,0 +1,209 @@
+import torch
+import torch.nn as nn
+
+from .layers import Layer, Pass, modules_from_layers
+from .module_types import CONV_MODULES, BATCH_NORM_MODULES, DROPOUT_MODULES
+from copy import deepcopy
+from collections.abc import Iterable, Sequence
+
+__all__ = [
+        'optimize',
+        'flatten_sequential',
+        'remove_identity',
+        'remove_noop_dropout',
+        'remove_dropout',
+        'merge_activations',
+        'fuse',
+        'fuse_bn',
+        'DEFAULT_PASSES',
+        'INFERENCE_PASSES',
+        'FUSABLE_MODULES',
+        'IDEMPOTENT_MODULES',
+]
+
+FUSABLE_MODULES = nn.Linear, *CONV_MODULES
+IDEMPOTENT_MODULES = nn.ReLU, nn.ReLU6, nn.Hardtanh
+
+def optimize(
+        *layers: Layer,
+        passes: Sequence[Pass] | None = None,
+        inference: bool = False,
+) -> Iterable[nn.Module]:
+    """
+    Simplify the given layers, without changing what they compute.
+
+    Arguments:
+        layers:
+            The layers to simplify.
+
+        passes:
+            The passes to apply, in order.  Each pass is a function that 
+            takes any number of layers (like this function) and yields 
+            modules.  Passes can therefore be chained, and any function with 
+            this signature can be used as a custom pass.  By default, 
+            `DEFAULT_PASSES` are used.
+
+        inference:
+            If true, and *passes* isn't specified, use `INFERENCE_PASSES` 
+            instead of `DEFAULT_PASSES`.  These passes may change the 
+            behavior of the model during training (e.g. by removing dropout), 
+            so they're only appropriate for models that will be used for 
+            inference or exported.
+
+    Returns:
+        The simplified modules.  Fewer modules means fewer Python function 
+        calls in every forward pass.
+    """
+    if passes is None:
+        passes = INFERENCE_PASSES if inference else DEFAULT_PASSES
+
+    modules = modules_from_layers(*layers)
+
+    for apply_pass in passes:
+        modules = apply_pass(modules)
+
+    yield from modules
+
+def flatten_sequential(*layers: Layer) -> Iterable[nn.Module]:
+    """
+    Replace any `nn.Sequential` modules with the modules they contain, 
+    recursively.
+
+    Subclasses of `nn.Sequential` are left alone, since they might override 
+    `forward()`.
+    """
+    for module in modules_from_layers(*layers):
+        if type(module) is nn.Sequential:
+            yield from flatten_sequential(module.children())
+        else:
+            yield module
+
+def remove_identity(*layers: Layer) -> Iterable[nn.Module]:
+    """
+    Remove any `nn.Identity` modules.
+    """
+    for module in modules_from_layers(*layers):
+        if type(module) is not nn.Identity:
+            yield module
+
+def remove_noop_dropout(*layers: Layer) -> Iterable[nn.Module]:
+    """
+    Remove any dropout modules with a dropout probability of 0.
+    """
+    for module in modules_from_layers(*layers):
+        if not (isinstance(module, DROPOUT_MODULES) and module.p == 0):
+            yield module
+
+def remove_dropout(*layers: Layer) -> Iterable[nn.Module]:
+    """
+    Remove every dropout module.
+
+    Dropout modules have no effect in eval mode, so this is appropriate for 
+    models that will only be used for inference.
+    """
+    for module in modules_from_layers(*layers):
+        if not isinstance(module, DROPOUT_MODULES):
+            yield module
+
+def merge_activations(*layers: Layer) -> Iterable[nn.Module]:
+    """
+    Merge consecutive copies of the same idempotent activation function (e.g.  
+    two ReLUs in a row) into a single module.
+
+    Modules are only merged if they have the same type and the same 
+    arguments, as reported by `repr()`.
+    """
+    prev = None
+
+    for module in modules_from_layers(*layers):
+        if _is_repeated_activation(prev, module):
+            continue
+
+        yield module
+        prev = module
+
+def fuse(*layers: Layer) -> Iterable[nn.Module]:
+    """
+    Fold each batch normalization module into the linear or convolutional 
+    module that immediately precedes it.
+
+    The batch normalization modules are removed from the resulting layers, 
+    and the linear/convolutional modules are replaced by copies with modified 
+    weights and biases.  Folding is based on the running statistics of the 
+    batch normalization modules, so the fused layers reproduce the behavior 
+    of the original layers in eval mode.  This means that fusion is only 
+    appropriate for inference.  Batch normalization modules that don't 
+    track running statistics are left as they are.
+
+    To fuse an existing sequential model, pass its children, e.g. 
+    `fuse(model.children())`.
+    """
+    prev = None
+
+    for module in modules_from_layers(*layers):
+        if _can_fuse(prev, module):
+            prev = fuse_bn(prev, module)
+            continue
+
+        if prev is not None:
+            yield prev
+
+        prev = module
+
+    if prev is not None:
+        yield prev
+
+def fuse_bn(module: nn.Module, bn: nn.Module) -> nn.Module:
+    """
+    Return a copy of the given linear/convolutional module, with the given 
+    batch normalization module folded into its weights and bias.
+    """
+    weight = module.weight
+    bias = module.bias
+
+    with torch.no_grad():
+        scale = torch.rsqrt(bn.running_var + bn.eps)
+        if bn.weight is not None:
+            scale = scale * bn.weight
+
+        shift = -bn.running_mean if bias is None else bias - bn.running_mean
+        shift = shift * scale
+        if bn.bias is not None:
+            shift = shift + bn.bias
+
+        # The output channels are always the first dimension of the weight 
+        # matrix, for both linear and convolutional modules.
+        weight = weight * scale.reshape(-1, *[1] * (weight.dim() - 1))
+
+    fused = deepcopy(module)
+    fused.weight = nn.Parameter(weight, module.weight.requires_grad)
+    fused.bias = nn.Parameter(shift, module.weight.requires_grad)
+    return fused
+
+def _is_repeated_activation(prev, module):
+    return (
+            isinstance(module, IDEMPOTENT_MODULES) and
+            type(prev) is type(module) and
+            repr(prev) == repr(module)
+    )
+
+def _can_fuse(module, bn):
+    return (
+            isinstance(module, FUSABLE_MODULES) and
+            isinstance(bn, BATCH_NORM_MODULES) and
+            bn.running_mean is not None and
+            bn.running_var is not None
+    )
+
+DEFAULT_PASSES = [
+        flatten_sequential,
+        remove_identity,
+        remove_noop_dropout,
+        merge_activations,
+]
+INFERENCE_PASSES = [
+        flatten_sequential,
+        remove_identity,
+        remove_dropout,
+        merge_activations,
+]
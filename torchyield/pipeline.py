@@ -0,0 +1,344 @@
+import torch
+import torch.nn as nn
+import torch.distributed as dist
+import torch.multiprocessing as mp
+import queue
+import threading
+import socket
+
+from .layers import Layer, FrozenSequential, modules_from_layer, _restore_buffers
+from time import perf_counter
+from collections.abc import Callable, Iterable, Iterator
+
+__all__ = [
+        'partition',
+        'run_pipeline',
+        'run_pipeline_stage',
+]
+
+def partition(
+        layers: Layer,
+        n_stages: int,
+        cost: str | Callable[[nn.Module], float] = 'params',
+        input_shape: tuple[int, ...] | None = None,
+) -> list[list[nn.Module]]:
+    """
+    Divide the given layers into contiguous stages of roughly equal cost.
+
+    Arguments:
+        layers:
+            The layers to divide.
+
+        n_stages:
+            The number of stages to create.  There must be at least as many 
+            modules as stages.
+
+        cost:
+            How to calculate the cost of each module:
+
+            - ``'params'``: The number of parameters in the module.
+            - ``'flops'``: The number of floating point operations needed to 
+              evaluate the module, as calculated by `estimate()`.
+            - ``'measured'``: The time needed to evaluate the module on a 
+              random input, as measured on the current device.
+            - A callable: Called with each module, and expected to return its 
+              cost.
+
+        input_shape:
+            The shape of the input to the first module, including the batch 
+            dimension.  Required for the ``'flops'`` and ``'measured'`` cost 
+            metrics.
+
+    Returns:
+        A list of stages, each of which is a list of modules.  The stages are 
+        chosen to minimize the cost of the most expensive stage.
+    """
+    modules = list(modules_from_layer(layers))
+
+    if n_stages < 1 or n_stages > len(modules):
+        raise ValueError(f"can't divide {len(modules)} module(s) into {n_stages} stage(s)")
+
+    costs = _get_costs(modules, cost, input_shape)
+    max_cost = _find_max_stage_cost(costs, n_stages)
+
+    stages = [[]]
+    stage_cost = 0
+
+    for i, (module, module_cost) in enumerate(zip(modules, costs)):
+        # Start a new stage if the current one would become too expensive, 
+        # or if there are only just enough modules left to give one to each 
+        # of the remaining stages.
+        remaining_modules = len(modules) - i
+        remaining_stages = n_stages - len(stages)
+
+        if stages[-1] and (
+                stage_cost + module_cost > max_cost or
+                remaining_modules == remaining_stages
+        ):
+            stages.append([])
+            stage_cost = 0
+
+        stages[-1].append(module)
+        stage_cost += module_cost
+
+    assert len(stages) == n_stages
+    return stages
+
+def run_pipeline(
+        stages: Iterable[Layer],
+        inputs: Iterable[torch.Tensor],
+        *,
+        backend: str = 'gloo',
+        init_method: str | None = None,
+) -> Iterator[torch.Tensor]:
+    """
+    Evaluate the given stages in separate processes, streaming inputs through 
+    them one micro-batch at a time.
+
+    Arguments:
+        stages:
+            The stages of the pipeline, e.g. as returned by `partition()`.  
+            Each stage is run in its own process, and the processes 
+            communicate via `torch.distributed`.
+
+        inputs:
+            The micro-batches to evaluate.  While one stage works on a 
+            micro-batch, the preceding stage can work on the next one.
+
+        backend:
+            The `torch.distributed` backend to use.
+
+        init_method:
+            The URL used to initialize the process group.  By default, a free 
+            TCP port on the local host is used.
+
+    Returns:
+        An iterator over the outputs of the final stage, in the same order as 
+        the inputs.  Outputs are yielded as soon as they become available.
+
+    Gradients are not tracked, so this is only suitable for inference.  To 
+    run the stages on different nodes, call `run_pipeline_stage()` on each 
+    node instead.
+    """
+    stages = [FrozenSequential(stage) for stage in stages]
+    world_size = len(stages)
+
+    if init_method is None:
+        init_method = f'tcp://127.0.0.1:{_find_free_port()}'
+
+    ctx = mp.get_context('spawn')
+    in_queue = ctx.Queue()
+    out_queue = ctx.Queue()
+
+    processes = [
+            ctx.Process(
+                target=run_pipeline_stage,
+                args=(stage, rank, world_size),
+                kwargs=dict(
+                    backend=backend,
+                    init_method=init_method,
+                    in_queue=in_queue if rank == 0 else None,
+                    out_queue=out_queue if rank == world_size - 1 else None,
+                ),
+                daemon=True,
+            )
+            for rank, stage in enumerate(stages)
+    ]
+    for process in processes:
+        process.start()
+
+    feed_errors = []
+
+    def feed_inputs():
+        # Always send the sentinel, even if the inputs can't be iterated, so 
+        # that the stage processes shut down.  The error itself is re-raised 
+        # in the main thread.
+        try:
+            for x in inputs:
+                in_queue.put(x)
+        except Exception as err:
+            feed_errors.append(err)
+        finally:
+            in_queue.put(None)
+
+    feeder = threading.Thread(target=feed_inputs, daemon=True)
+    feeder.start()
+
+    try:
+        while True:
+            try:
+                y = out_queue.get(timeout=1)
+            except queue.Empty:
+                if any(p.exitcode not in (None, 0) for p in processes):
+                    raise RuntimeError("pipeline stage failed") from None
+                continue
+
+            if y is None:
+                break
+
+            yield y
+
+        if feed_errors:
+            raise feed_errors[0]
+
+    finally:
+        for process in processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+
+def run_pipeline_stage(
+        stage: nn.Module,
+        rank: int,
+        world_size: int,
+        *,
+        backend: str = 'gloo',
+        init_method: str | None = None,
+        in_queue=None,
+        out_queue=None,
+) -> None:
+    """
+    Evaluate one stage of a pipeline, as part of a `torch.distributed` 
+    process group.
+
+    The first stage gets its inputs from *in_queue*, and the last stage puts 
+    its outputs in *out_queue*.  All other communication happens via 
+    point-to-point operations between consecutive ranks.  `None` marks the 
+    end of the inputs/outputs.
+    """
+    dist.init_process_group(
+            backend,
+            init_method=init_method,
+            rank=rank,
+            world_size=world_size,
+    )
+
+    try:
+        with torch.no_grad():
+            while True:
+                x = in_queue.get() if rank == 0 else _recv(rank - 1)
+                y = None if x is None else stage(x)
+
+                if rank == world_size - 1:
+                    out_queue.put(y)
+                else:
+                    _send(y, rank + 1)
+
+                if y is None:
+                    break
+
+    finally:
+        dist.destroy_process_group()
+
+
+DTYPES = [
+        torch.float32,
+        torch.float64,
+        torch.float16,
+        torch.bfloat16,
+        torch.int64,
+        torch.int32,
+        torch.bool,
+]
+
+def _send(x, dst):
+    # Send a header describing the tensor first, so the receiver can allocate 
+    # a buffer for it.  An empty header means there are no more tensors.
+    if x is None:
+        header = torch.tensor([], dtype=torch.int64)
+    else:
+        header = torch.tensor([DTYPES.index(x.dtype), *x.shape])
+
+    dist.send(torch.tensor([len(header)]), dst)
+
+    if x is not None:
+        dist.send(header, dst)
+        dist.send(x.contiguous(), dst)
+
+def _recv(src):
+    n = torch.empty(1, dtype=torch.int64)
+    dist.recv(n, src)
+
+    if n.item() == 0:
+        return None
+
+    header = torch.empty(n.item(), dtype=torch.int64)
+    dist.recv(header, src)
+
+    dtype, *shape = header.tolist()
+    x = torch.empty(shape, dtype=DTYPES[dtype])
+    dist.recv(x, src)
+
+    return x
+
+def _find_free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def _get_costs(modules, cost, input_shape):
+    if callable(cost):
+        return [cost(m) for m in modules]
+
+    if cost == 'params':
+        return [sum(p.numel() for p in m.parameters()) for m in modules]
+
+    if cost not in ('flops', 'measured'):
+        raise ValueError(f"unknown cost: {cost!r}\n• expected: 'params', 'flops', 'measured', or a callable")
+
+    if input_shape is None:
+        raise ValueError(f"cost={cost!r} requires `input_shape`")
+
+    if cost == 'flops':
+        from .estimate import estimate
+        return [x.flops for x in estimate(modules, input_shape).layers]
+
+    if cost == 'measured':
+        costs = []
+        x = torch.randn(input_shape)
+
+        with torch.no_grad():
+            for module in modules:
+                # Evaluate each module once before timing it, to exclude any 
+                # one-time setup costs.  Clone the inputs so that in-place 
+                # modules can't interfere, and restore any buffers so that 
+                # e.g. batch norm statistics aren't affected.
+                with _restore_buffers([module]):
+                    module(x.clone())
+
+                    start = perf_counter()
+                    x = module(x.clone())
+                    costs.append(perf_counter() - start)
+
+        return costs
+
+def _find_max_stage_cost(costs, n_stages):
+    # Binary search for the smallest cap on the cost of each stage that still 
+    # allows the modules to be divided into the requested number of stages.
+    lo, hi = max(costs), sum(costs)
+
+    if _count_stages(costs, lo) <= n_stages:
+        return lo
+
+    for _ in range(100):
+        mid = (lo + hi) / 2
+        if _count_stages(costs, mid) <= n_stages:
+            hi = mid
+        else:
+            lo = mid
+
+        if hi - lo <= 1e-9 * hi:
+            break
+
+    return hi
+
+def _count_stages(costs, max_cost):
+    n, stage_cost = 1, 0
+
+    for cost in costs:
+        if stage_cost + cost > max_cost:
+            n += 1
+            stage_cost = 0
+        stage_cost += cost
+
+    return n
@@ -0,0 +1,55 @@
+import torch
+import torch.nn as nn
+
+__all__ = [
+        'keep_fp32',
+        'is_fp32',
+        'Fp32Module',
+        'AUTOCAST_FP32_FACTORIES',
+]
+
+def keep_fp32(module: nn.Module) -> nn.Module:
+    """
+    Mark the given module to be evaluated in full precision, even when the
+    rest of the model is evaluated with autocast.
+
+    The factories already do this for precision-sensitive modules (see
+    `AUTOCAST_FP32_FACTORIES`), and `mlp_layer()` does this for its final
+    linear layer.  This function is for marking any other modules.  It only
+    has an effect when the module is part of a `FrozenSequential` created
+    with the *autocast* option.
+
+    Returns:
+        The given module, so that this function can be used inline, e.g.
+        ``yield keep_fp32(nn.Softmax(dim=-1))``.
+    """
+    module.autocast_fp32 = True
+    return module
+
+def is_fp32(module: nn.Module) -> bool:
+    """
+    Return true if the given module was marked by `keep_fp32()`.
+    """
+    return getattr(module, 'autocast_fp32', False)
+
+class Fp32Module(nn.Module):
+    """
+    Evaluate the given module with autocast disabled, after converting its
+    input to full precision.
+    """
+
+    def __init__(self, module: nn.Module):
+        super().__init__()
+        self.module = module
+
+    def forward(self, x, *args, **kwargs):
+        with torch.autocast(x.device.type, enabled=False):
+            return self.module(x.float(), *args, **kwargs)
+
+# The modules created for each of these factory names are marked with
+# `keep_fp32()`.  Batch norm statistics and sigmoid saturation both lose too
+# much accuracy in reduced precision.
+AUTOCAST_FP32_FACTORIES = {
+        'bn',
+        'sigmoid',
+}
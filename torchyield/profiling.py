@@ -0,0 +1,143 @@
+import torch
+import torch.nn as nn
+import json
+
+from time import perf_counter, process_time
+from dataclasses import dataclass, asdict
+from collections.abc import Iterable
+
+__all__ = [
+        'LayerStats',
+        'LayerProfiler',
+        'profile',
+]
+
+@dataclass
+class LayerStats:
+    name: str
+    module: str
+    calls: int = 0
+    wall_time: float = 0
+    cpu_time: float = 0
+    output_bytes: int = 0
+    output_shape: tuple[int, ...] | None = None
+
+    @property
+    def mean_wall_time(self):
+        return self.wall_time / self.calls if self.calls else 0
+
+    @property
+    def mean_cpu_time(self):
+        return self.cpu_time / self.calls if self.calls else 0
+
+class LayerProfiler:
+    """
+    Record how long each of the given modules takes to evaluate.
+
+    The following statistics are recorded for each module, and accumulated 
+    over every call:
+
+    - Wall time and CPU time, in seconds.  Note that the CPU time is measured 
+      for the whole process, so it includes time spent in any threads used by 
+      PyTorch.
+    - The shape and size (in bytes) of the output from the most recent call.  
+      This is a proxy for the memory allocated by the module.
+
+    In addition, each module is annotated with `torch.profiler.record_function`, 
+    so that the modules can be identified in traces collected by the PyTorch 
+    profiler.
+
+    The statistics are collected by forward hooks, so the modules themselves 
+    aren't changed in any way.  Call `remove()` to stop profiling.
+    """
+
+    def __init__(self, modules: Iterable[nn.Module], prefix: str = 'torchyield'):
+        self.stats = []
+        self._handles = []
+
+        for i, module in enumerate(modules):
+            stats = LayerStats(f'{prefix}.{i}', type(module).__name__)
+            pre_hook, post_hook = _make_hooks(stats)
+
+            self.stats.append(stats)
+            self._handles += [
+                    module.register_forward_pre_hook(pre_hook),
+                    module.register_forward_hook(post_hook, always_call=True),
+            ]
+
+    def reset(self) -> None:
+        for stats in self.stats:
+            stats.calls = 0
+            stats.wall_time = 0
+            stats.cpu_time = 0
+            stats.output_bytes = 0
+            stats.output_shape = None
+
+    def remove(self) -> None:
+        for handle in self._handles:
+            handle.remove()
+        self._handles = []
+
+    def to_dicts(self) -> list[dict]:
+        return [asdict(x) for x in self.stats]
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.to_dicts(), **kwargs)
+
+    def table(self) -> str:
+        header = ('layer', 'module', 'calls', 'wall (ms)', 'cpu (ms)', 'output shape', 'output (KiB)')
+        rows = [
+                (
+                    x.name,
+                    x.module,
+                    str(x.calls),
+                    f'{x.mean_wall_time * 1e3:.3f}',
+                    f'{x.mean_cpu_time * 1e3:.3f}',
+                    str(x.output_shape),
+                    f'{x.output_bytes / 2**10:.1f}',
+                )
+                for x in self.stats
+        ]
+        widths = [max(map(len, col)) for col in zip(header, *rows)]
+
+        lines = [
+                '  '.join(f'{x:<{w}}' for x, w in zip(row, widths))
+                for row in [header, *rows]
+        ]
+        lines.insert(1, '  '.join('─' * w for w in widths))
+
+        return '\n'.join(lines)
+
+    def __str__(self):
+        return self.table()
+
+def profile(modules: Iterable[nn.Module]) -> LayerProfiler:
+    """
+    Start profiling the given modules.  See `LayerProfiler` for details.
+    """
+    return LayerProfiler(modules)
+
+def _make_hooks(stats):
+    # Modules may be called recursively, so each call needs its own record of 
+    # when it started.
+    starts = []
+
+    def pre_hook(module, args):
+        record = torch.profiler.record_function(stats.name)
+        record.__enter__()
+        starts.append((record, perf_counter(), process_time()))
+
+    def post_hook(module, args, output):
+        record, wall_start, cpu_start = starts.pop()
+
+        stats.calls += 1
+        stats.wall_time += perf_counter() - wall_start
+        stats.cpu_time += process_time() - cpu_start
+
+        if isinstance(output, torch.Tensor):
+            stats.output_shape = tuple(output.shape)
+            stats.output_bytes = output.nbytes
+
+        record.__exit__(None, None, None)
+
+    return pre_hook, post_hook
@@ -0,0 +1,211 @@
+import torch
+import torch.nn as nn
+
+from .module_types import CONV_MODULES, BATCH_NORM_MODULES
+from torch.ao import quantization as tq
+from copy import deepcopy
+from contextlib import contextmanager
+from time import perf_counter
+from dataclasses import dataclass
+from collections.abc import Iterable
+from typing import TypeAlias
+
+__all__ = [
+        'CalibrationData',
+        'QuantizationReport',
+        'quantize_modules',
+        'find_fusable_modules',
+        'compare_quantized',
+        'FUSION_PATTERNS',
+]
+
+CalibrationData: TypeAlias = torch.Tensor | Iterable[torch.Tensor]
+
+@dataclass
+class QuantizationReport:
+    max_abs_error: float
+    mean_abs_error: float
+    float_time: float
+    quantized_time: float
+
+    @property
+    def speedup(self):
+        return self.float_time / self.quantized_time if self.quantized_time else 0
+
+def quantize_modules(
+        modules: Iterable[nn.Module],
+        mode: str,
+        calibration_data: CalibrationData | None = None,
+) -> nn.Module:
+    """
+    Convert the given modules into an int8 model.
+
+    Arguments:
+        modules:
+            The float modules to quantize.  These are not modified.
+
+        mode:
+            - ``'dynamic'``: Store the weights of every linear module as 
+              int8, and quantize the activations on the fly.  This doesn't 
+              require any calibration data.
+
+            - ``'static'``: Fuse each convolution/linear module with any 
+              batch norm and ReLU modules that immediately follow it (see 
+              `find_fusable_modules()`), then quantize both the weights and 
+              the activations of every module.  The activation ranges are 
+              observed by evaluating the model on *calibration_data*.
+
+        calibration_data:
+            Either a single input tensor, or an iterable of input tensors 
+            (e.g. batches from a data loader).  Required for static 
+            quantization.
+
+    Returns:
+        The quantized model, in eval mode.  For static quantization, the 
+        model converts its input to int8 and its output back to float, so it 
+        can be used as a drop-in replacement for the float model.  Quantized 
+        models can only be evaluated on the CPU.
+    """
+    # Work on a copy, so that not even the training flags of the given 
+    # modules are changed.
+    model = deepcopy(nn.Sequential(*modules)).eval()
+
+    if mode == 'dynamic':
+        return tq.quantize_dynamic(
+                model, {nn.Linear}, dtype=torch.qint8, inplace=True,
+        )
+
+    if mode == 'static':
+        if calibration_data is None:
+            raise ValueError("static quantization requires calibration data\n• did you mean to specify `calibration_data`?")
+
+        tq.fuse_modules(
+                model, find_fusable_modules(model.children()), inplace=True,
+        )
+        model = nn.Sequential(
+                tq.QuantStub(),
+                *model.children(),
+                tq.DeQuantStub(),
+        )
+        model.qconfig = tq.get_default_qconfig(torch.backends.quantized.engine)
+        model.eval()
+
+        tq.prepare(model, inplace=True)
+
+        with torch.no_grad():
+            for x in _get_batches(calibration_data):
+                model(x)
+
+        return tq.convert(model, inplace=True)
+
+    raise ValueError(f"unknown quantization mode: {mode!r}\n• expected: 'dynamic' or 'static'")
+
+def find_fusable_modules(modules: Iterable[nn.Module]) -> list[list[str]]:
+    """
+    Find the groups of adjacent modules that can be fused before static 
+    quantization.
+
+    These are the same patterns that the factories generate, e.g. 
+    ``conv2_bn_relu`` or ``linear_relu``.  The return value is a list of 
+    groups of module indices (as strings), in the format expected by 
+    `torch.ao.quantization.fuse_modules()`.
+    """
+    modules = list(modules)
+    groups = []
+    i = 0
+
+    while i < len(modules):
+        for pattern in FUSION_PATTERNS:
+            n = len(pattern)
+            candidates = modules[i:i + n]
+
+            if len(candidates) == n and all(
+                    isinstance(module, types)
+                    for module, types in zip(candidates, pattern)
+            ):
+                groups.append([str(j) for j in range(i, i + n)])
+                i += n
+                break
+        else:
+            i += 1
+
+    return groups
+
+def compare_quantized(
+        float_model: nn.Module,
+        quantized_model: nn.Module,
+        data: CalibrationData,
+        *,
+        repeat: int = 3,
+) -> QuantizationReport:
+    """
+    Compare the outputs and the speed of a float model and its quantized 
+    counterpart.
+
+    Both models are evaluated in eval mode on every input in *data*, and 
+    then restored to their original modes.  The errors are the absolute 
+    differences between the two outputs, and the times are the total wall 
+    times (in seconds) to evaluate every input *repeat* times.
+    """
+    batches = _get_batches(data)
+
+    max_error = 0
+    total_error = 0
+    numel = 0
+
+    with torch.no_grad(), _eval_mode(float_model, quantized_model):
+        for x in batches:
+            error = (float_model(x) - quantized_model(x)).abs()
+            max_error = max(max_error, error.max().item())
+            total_error += error.sum().item()
+            numel += error.numel()
+
+        float_time = _time_model(float_model, batches, repeat)
+        quantized_time = _time_model(quantized_model, batches, repeat)
+
+    return QuantizationReport(
+            max_abs_error=max_error,
+            mean_abs_error=total_error / numel if numel else 0,
+            float_time=float_time,
+            quantized_time=quantized_time,
+    )
+
+def _get_batches(data):
+    if isinstance(data, torch.Tensor):
+        return [data]
+    else:
+        return list(data)
+
+@contextmanager
+def _eval_mode(*models):
+    modes = [(x, x.training) for model in models for x in model.modules()]
+
+    for model in models:
+        model.eval()
+
+    try:
+        yield
+
+    finally:
+        for module, training in modes:
+            module.train(training)
+
+def _time_model(model, batches, repeat):
+    start = perf_counter()
+
+    for _ in range(repeat):
+        for x in batches:
+            model(x)
+
+    return perf_counter() - start
+
+# Longer patterns must come first, so that e.g. conv-bn-relu isn't fused as 
+# just conv-bn.
+FUSION_PATTERNS = [
+        (CONV_MODULES, BATCH_NORM_MODULES, nn.ReLU),
+        (CONV_MODULES, BATCH_NORM_MODULES),
+        (CONV_MODULES, nn.ReLU),
+        (nn.Linear, nn.BatchNorm1d),
+        (nn.Linear, nn.ReLU),
+        ((nn.BatchNorm2d, nn.BatchNorm3d), nn.ReLU),
+]
@@ -0,0 +1,108 @@
+import torch
+import torch.nn as nn
+
+from .layers import Layer, Device, module_from_layers, _build_modules
+from .initialize import Init, materialize
+
+__all__ = [
+        'rebuild',
+]
+
+def rebuild(
+        old_model: nn.Module,
+        *layers: Layer,
+        input_shape: tuple[int, ...] | None = None,
+        device: Device = None,
+        init: Init = 'default',
+        **kwargs,
+) -> nn.Module:
+    """
+    Build a model from the given layers, reusing as many modules as possible 
+    from an existing model.
+
+    Arguments:
+        old_model:
+            The existing model, e.g. the result of an earlier call to 
+            `module_from_layers()`.  Its children are compared to the new 
+            modules.
+
+        layers:
+            The layers of the new model.  These are first constructed on the 
+            meta device, so constructing them doesn't allocate or initialize 
+            any parameters.
+
+        input_shape:
+            The shape of the input to the first layer.  See 
+            `FrozenSequential` for details.
+
+        device:
+            The device to create new modules on.  By default, this is the 
+            device of the first parameter in the old model.
+
+        init:
+            How to initialize the new modules.  The reused modules are never 
+            reinitialized.  See `materialize()` for details.
+
+        kwargs:
+            Any other arguments to pass on to `module_from_layers()`, e.g. 
+            *fuse* or *checkpoint_segments*.  Arguments that would replace 
+            the parameters of every module (i.e. *cache_dir* and *seed*) 
+            aren't allowed.
+
+    Returns:
+        The new model.  The longest prefix and the longest suffix of new 
+        modules that match the old modules are replaced by the old modules 
+        themselves, including any trained parameters and buffers.  Two 
+        modules match if they have the same type, the same arguments (as 
+        reported by `repr()`), and parameters/buffers with the same names, 
+        shapes, and data types.  All other modules are materialized and 
+        initialized according to *init*, unless they were already 
+        constructed before being passed to this function.  Note that the new 
+        model shares the reused modules with the old model.
+    """
+    if unsupported := kwargs.keys() & {'cache_dir', 'seed'}:
+        raise ValueError(f"can't rebuild a model using: {', '.join(sorted(unsupported))}\n• these would replace the parameters of the reused modules")
+
+    old_modules = list(old_model.children()) or [old_model]
+    new_modules = _build_modules(layers, 'meta', input_shape)
+
+    if device is None:
+        param = next(old_model.parameters(), None)
+        device = param.device if param is not None else torch.get_default_device()
+
+    old_keys = [_get_match_key(x) for x in old_modules]
+    new_keys = [_get_match_key(x) for x in new_modules]
+    n = min(len(old_keys), len(new_keys))
+
+    prefix = 0
+    while prefix < n and old_keys[prefix] == new_keys[prefix]:
+        prefix += 1
+
+    suffix = 0
+    while suffix < n - prefix and old_keys[-suffix - 1] == new_keys[-suffix - 1]:
+        suffix += 1
+
+    changed = new_modules[prefix:len(new_modules) - suffix]
+    modules = [
+            *old_modules[:prefix],
+            *(
+                materialize(x, device, init=init) if _is_meta(x) else x
+                for x in changed
+            ),
+            *old_modules[len(old_modules) - suffix:],
+    ]
+
+    return module_from_layers(modules, **kwargs)
+
+def _is_meta(module):
+    # Modules that were already constructed before being passed to 
+    # `rebuild()` aren't affected by the meta device, and shouldn't be 
+    # reinitialized.
+    return any(x.is_meta for x in module.state_dict(keep_vars=True).values())
+
+def _get_match_key(module):
+    tensors = tuple(
+            (k, tuple(v.shape), v.dtype)
+            for k, v in module.state_dict(keep_vars=True).items()
+    )
+    return type(module), repr(module), tensors
@@ -0,0 +1,219 @@
+import torch
+import torch.nn as nn
+
+from .layers import Layer, modules_from_layer
+from torch.func import functional_call
+from contextvars import ContextVar
+from itertools import chain
+from math import ceil, floor, prod
+
+__all__ = [
+        'infer_shapes',
+        'get_curr_shape',
+        'output_shape',
+        'meta_forward',
+        'OUTPUT_SHAPE_GETTERS',
+]
+
+_curr_shape = ContextVar('torchyield_curr_shape', default=None)
+
+def infer_shapes(
+        layers: Layer,
+        input_shape: tuple[int, ...],
+) -> list[tuple[nn.Module, torch.Size]]:
+    """
+    Calculate the output shape of each module in the given layers.
+
+    Arguments:
+        layers:
+            The layers to calculate output shapes for.
+
+        input_shape:
+            The shape of the input to the first layer, including the batch 
+            dimension.
+
+    Returns:
+        A list of tuples, each containing a module and the shape of the 
+        output that module would produce.
+
+    The shapes are calculated by `output_shape()`, so no memory is allocated 
+    for any activations.  The modules are constructed one at a time, and each 
+    is constructed only after the shape of its input is known.  This is what 
+    allows factories to accept `in_channels='auto'`; see `get_curr_shape()`.
+    """
+    shape = torch.Size(input_shape)
+    shapes = []
+
+    token = _curr_shape.set(shape)
+
+    try:
+        for i, module in enumerate(modules_from_layer(layers)):
+            try:
+                next_shape = output_shape(module, shape)
+            except (RuntimeError, ValueError) as err:
+                raise ValueError(f"layer {i} can't accept input of shape {tuple(shape)}\n• module: {module}\n✖ {err}") from err
+
+            shape = next_shape
+            _curr_shape.set(shape)
+            shapes.append((module, shape))
+
+    finally:
+        _curr_shape.reset(token)
+
+    return shapes
+
+def get_curr_shape() -> torch.Size | None:
+    """
+    Return the shape of the input that the next module will receive.
+
+    This is only known while layers are being built by `infer_shapes()`, e.g.  
+    when `input_shape` is passed to `module_from_layers()`.  Otherwise, `None` 
+    is returned.
+    """
+    return _curr_shape.get()
+
+def output_shape(module: nn.Module, input_shape: tuple[int, ...]) -> torch.Size:
+    """
+    Calculate the shape of the output that the given module would produce, 
+    given an input of the given shape.
+
+    The most common modules are handled analytically, which is fast.  Any 
+    other modules are evaluated on the meta device, which is slower, but 
+    still doesn't allocate any memory.
+    """
+    try:
+        getter = OUTPUT_SHAPE_GETTERS[type(module)]
+    except KeyError:
+        x = torch.empty(input_shape, device='meta')
+        return meta_forward(module, x).shape
+    else:
+        return torch.Size(getter(module, tuple(input_shape)))
+
+def meta_forward(module: nn.Module, x: torch.Tensor) -> torch.Tensor:
+    """
+    Evaluate the given module on the meta device, without modifying it.
+    """
+    meta_tensors = {
+            k: v.to('meta')
+            for k, v in chain(
+                module.named_parameters(),
+                module.named_buffers(),
+            )
+    }
+    with torch.no_grad():
+        return functional_call(module, meta_tensors, (x.to('meta'),))
+
+
+def _get_same_shape(module, shape):
+    return shape
+
+def _get_linear_shape(module, shape):
+    if not shape or shape[-1] != module.in_features:
+        raise ValueError(f"expected {module.in_features} input features")
+
+    return *shape[:-1], module.out_features
+
+def _get_conv_shape(module, shape):
+    dim = len(module.kernel_size)
+    _check_spatial_dims(shape, dim)
+
+    if shape[-dim - 1] != module.in_channels:
+        raise ValueError(f"expected {module.in_channels} input channels")
+
+    if module.padding == 'same':
+        return *shape[:-dim - 1], module.out_channels, *shape[-dim:]
+
+    padding = (0,) * dim if module.padding == 'valid' else module.padding
+    spatial_shape = [
+            _get_window_size(*args)
+            for args in zip(
+                shape[-dim:],
+                module.kernel_size,
+                module.stride,
+                padding,
+                module.dilation,
+            )
+    ]
+    return *shape[:-dim - 1], module.out_channels, *spatial_shape
+
+def _pool_shape_getter(dim):
+
+    def _get_pool_shape(module, shape):
+        _check_spatial_dims(shape, dim)
+
+        def expand(x):
+            return (x,) * dim if isinstance(x, int) else tuple(x)
+
+        kernel_size = expand(module.kernel_size)
+        stride = expand(module.stride or module.kernel_size)
+        padding = expand(module.padding)
+        dilation = expand(getattr(module, 'dilation', 1))
+
+        spatial_shape = [
+                _get_window_size(*args, ceil_mode=module.ceil_mode)
+                for args in zip(
+                    shape[-dim:],
+                    kernel_size,
+                    stride,
+                    padding,
+                    dilation,
+                )
+        ]
+        return *shape[:-dim], *spatial_shape
+
+    return _get_pool_shape
+
+def _get_bn_shape(module, shape):
+    if len(shape) < 2 or shape[1] != module.num_features:
+        raise ValueError(f"expected {module.num_features} input channels")
+
+    return shape
+
+def _get_flatten_shape(module, shape):
+    start = module.start_dim % len(shape)
+    end = module.end_dim % len(shape)
+    return *shape[:start], prod(shape[start:end + 1]), *shape[end + 1:]
+
+def _check_spatial_dims(shape, dim):
+    if len(shape) not in (dim + 1, dim + 2):
+        raise ValueError(f"expected {dim + 1}D or {dim + 2}D input")
+
+def _get_window_size(size, kernel_size, stride, padding, dilation, ceil_mode=False):
+    # This is the same formula that PyTorch uses for convolution and pooling.
+    n = size + 2 * padding - dilation * (kernel_size - 1) - 1
+    out = (ceil if ceil_mode else floor)(n / stride) + 1
+
+    # The last window must start within the input (or the left padding).
+    if ceil_mode and (out - 1) * stride >= size + padding:
+        out -= 1
+
+    if out < 1:
+        raise ValueError("input is too small")
+
+    return out
+
+OUTPUT_SHAPE_GETTERS = {
+        nn.Linear: _get_linear_shape,
+        nn.Conv1d: _get_conv_shape,
+        nn.Conv2d: _get_conv_shape,
+        nn.Conv3d: _get_conv_shape,
+        nn.MaxPool1d: _pool_shape_getter(1),
+        nn.MaxPool2d: _pool_shape_getter(2),
+        nn.MaxPool3d: _pool_shape_getter(3),
+        nn.AvgPool1d: _pool_shape_getter(1),
+        nn.AvgPool2d: _pool_shape_getter(2),
+        nn.AvgPool3d: _pool_shape_getter(3),
+        nn.BatchNorm1d: _get_bn_shape,
+        nn.BatchNorm2d: _get_bn_shape,
+        nn.BatchNorm3d: _get_bn_shape,
+        nn.Flatten: _get_flatten_shape,
+        nn.Identity: _get_same_shape,
+        nn.ReLU: _get_same_shape,
+        nn.LeakyReLU: _get_same_shape,
+        nn.ELU: _get_same_shape,
+        nn.SELU: _get_same_shape,
+        nn.GELU: _get_same_shape,
+        nn.Sigmoid: _get_same_shape,
+        nn.Tanh: _get_same_shape,
+        nn.Dropout: _get_same_shape,
+}
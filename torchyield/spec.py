@@ -0,0 +1,196 @@
+"""
+Describe layers without constructing any modules.
+
+This module doesn't import `torch`, so it can be used by programs (e.g. 
+hyperparameter sweep controllers) that need to generate and compare large 
+numbers of architectures, but never need to actually evaluate them.  It 
+provides the same factories as the main `torchyield` namespace, except that 
+these factories return `Spec` objects instead of modules::
+
+    >>> import torchyield.spec as tys
+    >>> tys.conv2_relu_layer(in_channels=1, out_channels=2, kernel_size=3)
+    Spec(factory='conv2_relu_layer', kwargs=(('in_channels', 1), ('kernel_size', 3), ('out_channels', 2)))
+
+Specs are immutable, hashable, and can be converted to/from JSON.  A sequence 
+of specs can be turned into actual modules using `torchyield.build()`.
+"""
+
+import json
+import hashlib
+
+from .params import broadcast_params, channels as channels
+from dataclasses import dataclass
+from functools import cache
+from collections.abc import Callable, Iterable
+from typing import Any
+
+@dataclass(frozen=True)
+class Spec:
+    """
+    A description of a layer: the name of the factory that creates it, and 
+    the arguments to pass to that factory.
+
+    The factory can either be the name of a `torchyield` layer factory (e.g. 
+    ``'conv2_relu_layer'``) or the fully qualified name of any other callable 
+    that returns a module or an iterable of modules (e.g. 
+    ``'torch.nn.Flatten'``).
+
+    The arguments are stored as a sorted tuple of key/value pairs.  Any lists 
+    or dicts are converted to tuples, so that the spec is hashable.  Data 
+    types and devices are converted to strings.
+    """
+    factory: str
+    kwargs: tuple[tuple[str, Any], ...] = ()
+
+    @classmethod
+    def create(cls, factory: str, **kwargs) -> 'Spec':
+        return cls(factory, _freeze(kwargs))
+
+    @classmethod
+    def from_dict(cls, d: dict) -> 'Spec':
+        return cls.create(d['factory'], **d['kwargs'])
+
+    def to_dict(self) -> dict:
+        return {'factory': self.factory, 'kwargs': dict(self.kwargs)}
+
+def module(factory: str, **kwargs) -> Spec:
+    """
+    Describe a module that isn't created by one of the `torchyield` layer 
+    factories, e.g. ``module('torch.nn.Flatten')``.
+    """
+    return Spec.create(factory, **kwargs)
+
+def make_layers(layer_factory: Callable[..., Any], **params) -> tuple[Spec, ...]:
+    """
+    Call the given spec factory once for each set of broadcasted parameters, 
+    like `torchyield.make_layers()`.
+    """
+    return tuple(_flatten(layer_factory(**kwargs) for kwargs in broadcast_params(params)))
+
+def mlp_layer(layer_factory, in_channels, out_channels, **kwargs) -> tuple[Spec, ...]:
+    """
+    Describe a multilayer perceptron, like `torchyield.mlp_layer()`.
+    """
+    return (
+            *make_layers(
+                layer_factory,
+                in_channels=in_channels[:-1],
+                out_channels=out_channels[:-1],
+                **kwargs,
+            ),
+            Spec.create(
+                'linear_layer',
+                in_channels=in_channels[-1],
+                out_channels=out_channels[-1],
+                bias=True,
+                keep_fp32=True,
+                **{k: v for k, v in kwargs.items() if k in _MLP_OUTPUT_KWARGS},
+            ),
+    )
+
+def to_json(specs: Spec | Iterable[Spec]) -> str:
+    """
+    Serialize the given spec(s) as a JSON string.
+
+    The output is canonical, i.e. equivalent specs always produce exactly the 
+    same string.
+    """
+    if isinstance(specs, Spec):
+        data = specs.to_dict()
+    else:
+        data = [x.to_dict() for x in _flatten(specs)]
+
+    return json.dumps(data, sort_keys=True, separators=(',', ':'))
+
+def from_json(s: str) -> Spec | tuple[Spec, ...]:
+    data = json.loads(s)
+
+    if isinstance(data, dict):
+        return Spec.from_dict(data)
+    else:
+        return tuple(map(Spec.from_dict, data))
+
+def key(specs: Spec | Iterable[Spec]) -> str:
+    """
+    Return a hash that uniquely identifies the structure of the given spec(s).
+
+    Unlike `hash()`, this key is the same in every process, so it can be used 
+    to identify architectures in persistent caches.
+    """
+    return hashlib.sha256(to_json(specs).encode()).hexdigest()
+
+def build(specs: Spec | Iterable[Spec]):
+    """
+    Construct the modules described by the given spec(s).
+
+    The return value is a generator that yields each module as it's 
+    constructed, so it can be used anywhere that a layer is expected, e.g. 
+    `module_from_layers()`.
+
+    A ``keep_fp32=True`` argument isn't passed on to the factory.  Instead, 
+    the modules it creates are marked with `keep_fp32()`.
+    """
+    from .factory import make_factory
+    from .precision import keep_fp32
+    from pkgutil import resolve_name
+    import torch
+
+    for spec in _flatten([specs]):
+        if '.' in spec.factory:
+            factory = resolve_name(spec.factory)
+        else:
+            factory = make_factory(spec.factory)
+
+        kwargs = dict(spec.kwargs)
+        if isinstance(dtype := kwargs.get('dtype'), str):
+            kwargs['dtype'] = getattr(torch, dtype)
+
+        fp32 = kwargs.pop('keep_fp32', False)
+        layer = factory(**kwargs)
+
+        if isinstance(layer, torch.nn.Module):
+            layer = [layer]
+
+        for module in layer:
+            yield keep_fp32(module) if fp32 else module
+
+# The arguments that `mlp_layer()` passes to its output layer, in addition to 
+# the number of channels.
+_MLP_OUTPUT_KWARGS = 'device', 'dtype', 'init', 'memory_format'
+
+def __getattr__(name):
+    if not name.endswith('_layer'):
+        raise AttributeError(name)
+
+    return _make_spec_factory(name)
+
+@cache
+def _make_spec_factory(name):
+
+    def factory(**kwargs):
+        return Spec.create(name, **kwargs)
+
+    factory.__name__ = name
+    factory.__qualname__ = f'torchyield.spec.{name}'
+
+    return factory
+
+def _freeze(x):
+    if isinstance(x, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in x.items()))
+
+    if isinstance(x, (list, tuple)):
+        return tuple(map(_freeze, x))
+
+    # Convert data types and devices to strings, without importing torch.
+    if type(x).__module__ == 'torch' and type(x).__name__ in ('dtype', 'device'):
+        return str(x).removeprefix('torch.')
+
+    return x
+
+def _flatten(specs):
+    for spec in specs:
+        if isinstance(spec, Spec):
+            yield spec
+        else:
+            yield from _flatten(spec)
@@ -0,0 +1,160 @@
+import torch
+import torch.multiprocessing as mp
+import os
+
+from .layers import LayerFactory, module_from_layers
+from .estimate import estimate
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from itertools import product
+from time import perf_counter
+from collections.abc import Iterable, Iterator
+from typing import Any, TypeAlias
+
+__all__ = [
+        'Grid',
+        'SweepResult',
+        'sweep',
+        'evaluate_candidate',
+]
+
+Grid: TypeAlias = dict[str, list[Any]] | Iterable[dict[str, Any]]
+
+@dataclass
+class SweepResult:
+    hparams: dict[str, Any]
+    params: int | None = None
+    flops: int | None = None
+    latency: float | None = None
+    error: str | None = None
+
+def sweep(
+        layer_factory: LayerFactory,
+        grid: Grid,
+        input_shape: tuple[int, ...],
+        *,
+        workers: int | None = None,
+        repeat: int = 10,
+) -> Iterator[SweepResult]:
+    """
+    Build, check, and time every candidate architecture in a grid of 
+    hyperparameters.
+
+    Arguments:
+        layer_factory:
+            A function that yields the layers of a candidate, given keyword 
+            arguments from the grid.  If *workers* isn't 0, this function 
+            must be picklable (e.g. defined at the top level of a module).
+
+        grid:
+            Either a dictionary mapping argument names to lists of values to 
+            try, in which case every combination of values is a candidate, 
+            or an iterable of dictionaries, each of which is a candidate. 
+            Note that list values (e.g. from `channels()`) must be wrapped in 
+            another list, e.g. ``{'out_channels': [[8, 16], [16, 32]]}``.
+
+        input_shape:
+            The shape of the input to each candidate, including the batch 
+            dimension.
+
+        workers:
+            The number of processes to evaluate candidates in.  By default, 
+            one process is used per CPU.  The PyTorch threads are divided 
+            evenly between the processes, so that the candidates don't 
+            compete with each other for CPU time.  If 0, the candidates are 
+            evaluated one at a time in the current process.
+
+        repeat:
+            The number of forward passes to time for each candidate.  The 
+            fastest is reported.
+
+    Returns:
+        An iterator of `SweepResult` objects, one per candidate, in the 
+        order that the candidates finish.  This means the results of the 
+        cheapest candidates are typically available first.  Each result 
+        includes the number of parameters and FLOPs (see `estimate()`) and 
+        the latency (in seconds) of one forward pass on the CPU.  If a 
+        candidate can't be built, can't accept an input of the given shape, 
+        or fails for any other reason, the result instead includes an error 
+        message, and the rest of the sweep continues.
+    """
+    candidates = _expand_grid(grid)
+
+    if workers == 0:
+        for hparams in candidates:
+            yield evaluate_candidate(layer_factory, hparams, input_shape, repeat)
+        return
+
+    workers = workers or os.cpu_count()
+    num_threads = max(1, torch.get_num_threads() // workers)
+
+    executor = ProcessPoolExecutor(
+            workers,
+            mp_context=mp.get_context('spawn'),
+            initializer=torch.set_num_threads,
+            initargs=(num_threads,),
+    )
+
+    try:
+        futures = [
+                executor.submit(
+                    evaluate_candidate,
+                    layer_factory, hparams, input_shape, repeat,
+                )
+                for hparams in candidates
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+def evaluate_candidate(
+        layer_factory: LayerFactory,
+        hparams: dict[str, Any],
+        input_shape: tuple[int, ...],
+        repeat: int = 10,
+) -> SweepResult:
+    """
+    Build, check, and time a single candidate architecture.
+
+    See `sweep()` for details.
+    """
+    try:
+        cost = estimate(layer_factory(**hparams), input_shape)
+
+        module = module_from_layers(
+                layer_factory(**hparams),
+                input_shape=input_shape,
+        )
+        module.eval()
+
+        x = torch.randn(input_shape)
+        latency = float('inf')
+
+        with torch.no_grad():
+            module(x)
+
+            for _ in range(repeat):
+                start = perf_counter()
+                module(x)
+                latency = min(latency, perf_counter() - start)
+
+    # One bad candidate (e.g. a bug in the layer factory for some 
+    # combination of hyperparameters) shouldn't abort the whole sweep.
+    except Exception as err:
+        return SweepResult(hparams, error=f'{type(err).__name__}: {err}')
+
+    return SweepResult(
+            hparams,
+            params=cost.params,
+            flops=cost.flops,
+            latency=latency,
+    )
+
+def _expand_grid(grid):
+    if isinstance(grid, dict):
+        keys = list(grid)
+        return [dict(zip(keys, values)) for values in product(*grid.values())]
+    else:
+        return list(grid)
@@ -1,5 +1,9 @@
 import torch
 
+__all__ = [
+        'monkeypatch_tensor_repr',
+]
+
 def monkeypatch_tensor_repr():
     torch.Tensor.__repr__ = lambda x: f'torch.Tensor(shape={tuple(x.shape)})'
 
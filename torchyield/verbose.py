@@ -1,5 +1,16 @@
 import torch.nn as nn
 
+__all__ = [
+        'BRIGHT_WHITE',
+        'RESET_COLOR',
+        'DEFAULT_VERBOSE_TEMPLATE',
+        'VerboseModuleWrapper',
+        'VerboseIdentity',
+        'verbose',
+        'VerboseHooks',
+        'add_verbose_hooks',
+]
+
 BRIGHT_WHITE = '\033[97m'
 RESET_COLOR = '\033[0m'
 DEFAULT_VERBOSE_TEMPLATE = f'{BRIGHT_WHITE}{{}}\nin: {{}}{RESET_COLOR}\n{79*"─"}'
@@ -21,4 +32,79 @@ VerboseIdentity = VerboseModuleWrapper(nn.Identity())
 def verbose(layers):
     yield from map(VerboseModuleWrapper, layers)
 
+class VerboseHooks:
+    """
+    Print each of the given modules, along with the shape of its input, 
+    whenever it is called.
+
+    Unlike `VerboseModuleWrapper`, this works by registering forward hooks.  
+    That means that the structure of the model (and therefore the keys of its 
+    state dict) are unchanged, and that the hooks can be added to and removed 
+    from an existing model without rebuilding it.
+
+    Arguments:
+        modules:
+            The modules to print.
+
+        first:
+            Only print the first *first* calls to each module.
+
+        every:
+            Only print every *every*-th call to each module, starting with 
+            the first.
+
+        template:
+            A format string used to print each module.  It will be formatted 
+            with the module and the shape of its input.
+
+        kwargs:
+            Any additional arguments to pass to `print()`.
+    """
+
+    def __init__(
+            self,
+            modules,
+            *,
+            first=None,
+            every=None,
+            template=DEFAULT_VERBOSE_TEMPLATE,
+            **kwargs,
+    ):
+        self.first = first
+        self.every = every
+        self.template = template
+        self.print_kwargs = kwargs
+        self._handles = [
+                module.register_forward_pre_hook(self._make_hook())
+                for module in modules
+        ]
+
+    def remove(self):
+        for handle in self._handles:
+            handle.remove()
+        self._handles = []
+
+    def _make_hook(self):
+        calls = 0
+
+        def hook(module, args):
+            nonlocal calls
+            i, calls = calls, calls + 1
+
+            if self.first is not None and i >= self.first:
+                return
+            if self.every is not None and i % self.every:
+                return
+
+            print(self.template.format(module, args[0].shape), **self.print_kwargs)
+
+        return hook
 
+def add_verbose_hooks(module, **kwargs):
+    """
+    Print each child of the given module (or the module itself, if it has no 
+    children) whenever it is called.  See `VerboseHooks` for a description 
+    of the arguments.  Call `remove()` on the return value to stop printing.
+    """
+    modules = list(module.children()) or [module]
+    return VerboseHooks(modules, **kwargs)